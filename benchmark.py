@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# Benchmarks for the hot paths of the terminal games
+#
+# Every benchmark runs at a few sizes and reports its throughput, the
+# scaling exponent over the sizes and the change against a JSON baseline.
+# The exit code is 1 when a benchmark is slower than the baseline by more
+# than the tolerance, so it can guard changes.
+
+import sys
+import os
+import math
+import json
+import time
+import types
+import random
+import curses
+import shutil
+import socket
+import argparse
+import tempfile
+import functools
+import subprocess
+
+from terminal_games import color_wars, framebuffer, pig, snake, spectate
+from terminal_games.framebuffer import FrameBuffer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, 'benchmark.json')
+
+
+class FakeWindow:
+	# Stands in for a curses window or pad, keeps what is drawn so rendering
+	# costs about what it would cost on a screen
+
+	def __init__(self, rows=40, colls=100):
+		self.rows = rows
+		self.colls = colls
+		self.cells = {}
+		self.writes = 0
+
+	def getmaxyx(self):
+		return self.rows, self.colls
+
+	def addstr(self, row, coll, text, attr=0):
+		self.cells[row, coll] = (text, attr)
+		self.writes += 1
+
+	def clear(self):
+		self.cells.clear()
+
+	erase = clear
+
+	def getkey(self):
+		raise curses.error('no input')
+
+	def __getattr__(self, name):
+		# refresh, noutrefresh, nodelay, keypad, timeout, ...
+		return lambda *args, **kwargs: None
+
+
+def fake_curses(rows=40, colls=100):
+	fake = types.SimpleNamespace(**dict((name, value) for name, value in vars(curses).items() if name.isupper()))
+	fake.error = curses.error
+	fake.color_pair = lambda number: number << 8
+	fake.newwin = lambda *args: FakeWindow(*args[:2])
+	fake.newpad = lambda *args: FakeWindow(*args[:2])
+	fake.curs_set = fake.init_pair = fake.doupdate = lambda *args: None
+	fake.screen = FakeWindow(rows, colls)
+	return fake
+
+
+# Benchmarks
+# -----------------------------------------------------------------------------
+# A benchmark gets a size and returns a run function, the run function does
+# the timed work and returns the number of operations it did.
+
+BENCHMARKS = []
+
+
+def benchmark(name, unit, sizes=(None,)):
+	def register(setup):
+		BENCHMARKS.append((name, unit, sizes, setup))
+		return setup
+	return register
+
+
+@benchmark('color-wars conquer', 'moves', (25, 50, 100, 200))
+def color_wars_conquer(size):
+	start = color_wars.GameState(size, (None, None), seed=size)
+
+	def run():
+		state = start.copy()
+		rng = random.Random(size)
+		moves = 0
+		while not state.game_won() and moves < size * 4:
+			state.current_player.color = rng.choice([color for color in color_wars.Colors.COLORS if state.color_free(color)])
+			state.current_player.qonquer_cells(state.colors, state.other_player)
+			state.switch_players()
+			moves += 1
+		return moves
+	return run
+
+
+def bot_game(size, level, max_moves):
+	start = color_wars.GameState(size, (level, level), seed=size)
+	start.regions
+
+	def run():
+		state = start.copy()
+		for player in (state.current_player, state.other_player):
+			player.search = color_wars.Search()
+			player.border = color_wars.BorderIndex()
+
+		moves = 0
+		while not state.game_won() and moves < max_moves:
+			state.apply_move(state.current_player.pick_color(state, None))
+			moves += 1
+		return moves
+	return run
+
+
+@benchmark('color-wars pick_color easy', 'moves', (25, 50, 100, 200))
+def color_wars_pick_easy(size):
+	return bot_game(size, 'easy', size * 4)
+
+
+@benchmark('color-wars pick_color normal', 'moves', (25, 50))
+def color_wars_pick_normal(size):
+	return bot_game(size, 'normal', 4)
+
+
+@benchmark('flood-it beam search', 'solves', (14, 25))
+def flood_it_beam(size):
+	state = color_wars.PuzzleState(size, (None, None), seed=size)
+
+	def run():
+		solver = color_wars.FloodIt(state.field, (size - 1) * size)
+		solver.beam(16)
+		return 1
+	return run
+
+
+@benchmark('snake tick', 'ticks', (25, 50, 100))
+def snake_tick(size):
+	env = snake.SnakeEnv(size)
+	rng = random.Random(0)
+	actions = [rng.choice([None, None, None, env.UP, env.LEFT, env.DOWN, env.RIGHT]) for index in range(997)]
+
+	def run():
+		env.reset(size)
+		for action in actions:
+			state, reward, done = env.step(action)
+			if done:
+				env.reset()
+		return len(actions)
+	return run
+
+
+@benchmark('snake autopilot tick', 'ticks', (16, 32))
+def snake_autopilot(size):
+	env = snake.SnakeEnv(size)
+	pilot = snake.Autopilot(env)
+	env.reset(size)
+
+	def run():
+		for tick in range(200):
+			state, reward, done = env.step(pilot.next_action())
+			if done:
+				env.reset()
+		return 200
+	return run
+
+
+def snake_game(size, half_blocks=False):
+	game = snake.Snake(half_blocks=half_blocks)
+	game.FIELD_SIZE = size
+	game.env = snake.SnakeEnv(size)
+	game.env.reset(size)
+	rows, colls = ((size + 3) // 2, size + 3) if half_blocks else (size + 2, size * 2 + 6)
+	game.board = FrameBuffer(FakeWindow(rows, colls), rows, colls)
+	game.render_board()
+	return game
+
+
+def snake_frames(game, frames, after_frame=lambda: None):
+	rng = random.Random(0)
+
+	def run():
+		for frame in range(frames):
+			if game.env.step(rng.choice([None, None, None, game.env.UP, game.env.LEFT, game.env.DOWN, game.env.RIGHT]))[2]:
+				game.env.reset()
+			game.render_board()
+			after_frame()
+		return frames
+	run.buffers = [game.board]
+	return run
+
+
+@benchmark('snake render_board', 'frames', (25, 50, 100))
+def snake_render(size):
+	return snake_frames(snake_game(size), 20)
+
+
+@benchmark('snake render_board half blocks', 'frames', (25, 50, 100))
+def snake_render_half_blocks(size):
+	return snake_frames(snake_game(size, True), 20)
+
+
+# Spectators that read every frame, the publish time per frame is printed
+# next to the rate
+@benchmark('snake render_board spectators', 'frames', (1, 8, 64))
+def snake_spectators(viewers):
+	game = snake_game(25)
+	directory = tempfile.mkdtemp()
+	clients = []
+
+	def close():
+		try:
+			for client in clients:
+				client.close()
+			if game.spectators:
+				game.spectators.close()
+		finally:
+			shutil.rmtree(directory, ignore_errors=True)
+
+	try:
+		path = os.path.join(directory, 'benchmark.sock')
+		game.spectators = spectate.Broadcaster(path, snake.Snake.COLOR_PAIRS)
+		for viewer in range(viewers):
+			client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			client.connect(path)
+			client.setblocking(False)
+			clients.append(client)
+		game.render_board()
+	except BaseException:
+		close()
+		raise
+
+	def read():
+		for client in clients:
+			try:
+				while client.recv(65536):
+					pass
+			except BlockingIOError:
+				pass
+
+	run = snake_frames(game, 20, read)
+	run.spectators = game.spectators
+	run.close = close
+	return run
+
+
+def color_wars_engine(size, zoom, half_blocks=False):
+	engine = color_wars.GameEngine('easy', size, half_blocks=half_blocks)
+	engine.state = color_wars.GameState(size, ('easy', 'easy'), seed=size)
+	engine.window = color_wars.curses.screen
+	engine.blocks = framebuffer.half_blocks(engine.HALF_BLOCK_COLORS)
+	engine.layout()
+	engine.reset_view()
+	engine.zoom_view(zoom)
+
+	# Some territory to draw
+	for move in range(size):
+		engine.state.apply_move(engine.state.current_player.pick_color(engine.state, None))
+	engine.render_field()
+
+	# A move between frames, like in a game
+	rng = random.Random(size)
+
+	def run():
+		for frame in range(5):
+			state = engine.state
+			state.apply_move(rng.choice([color for color in color_wars.Colors.COLORS if state.color_free(color)]))
+			engine.render_field()
+		return 5
+	run.buffers = [engine.field_buffer]
+	return run
+
+
+@benchmark('color-wars render_field', 'frames', (25, 100, 400))
+def color_wars_render(size):
+	return color_wars_engine(size, 1)
+
+
+@benchmark('color-wars render_field zoomed out', 'frames', (100, 400))
+def color_wars_render_zoomed(size):
+	return color_wars_engine(size, size)
+
+
+# Two rows per line, on the same screen more of the bigger boards is shown
+@benchmark('color-wars render_field half blocks', 'frames', (25, 100, 400))
+def color_wars_render_half_blocks(size):
+	return color_wars_engine(size, 1, True)
+
+
+@benchmark('pig turns', 'turns')
+def pig_turns(size):
+
+	def run():
+		wins, lengths = pig.play_games(['hold20', 'sup_bot'], 200, seed=0)
+		return sum(length * count for length, count in lengths.items())
+	return run
+
+
+@benchmark('pig turns optimal', 'turns')
+def pig_turns_optimal(size):
+	pig.PigPolicy.load()
+
+	def run():
+		wins, lengths = pig.play_games(['optimal', 'optimal'], 200, seed=0)
+		return sum(length * count for length, count in lengths.items())
+	return run
+
+
+# Starting a fresh interpreter and importing a game, what the launcher
+# does before a game shows up
+def cold_start(module, size):
+	command = [sys.executable, '-c', 'import ' + module if module else 'pass']
+
+	def run():
+		subprocess.run(command, check=True, cwd=HERE)
+		return 1
+	return run
+
+
+for name, module in (
+	('python', None),
+	('launcher', 'terminal_games.launcher'),
+	('snake', 'terminal_games.snake'),
+	('color-wars', 'terminal_games.color_wars'),
+	('pig', 'terminal_games.pig'),
+):
+	benchmark('cold start ' + name, 'starts')(functools.partial(cold_start, module))
+
+
+# Runner
+# -----------------------------------------------------------------------------
+
+
+def measure(run, min_time, repeats):
+	# Best rate over the repeats, every repeat runs for at least min_time
+	best = 0
+	for repeat in range(repeats):
+		operations = 0
+		start = time.perf_counter()
+		while True:
+			operations += run()
+			elapsed = time.perf_counter() - start
+			if elapsed >= min_time:
+				break
+		best = max(best, operations / elapsed)
+	return best
+
+
+def scaling_exponent(rates):
+	# Least squares slope of log(time per operation) against log(size)
+	points = [(math.log(size), -math.log(rate)) for size, rate in rates]
+	if len(points) < 2:
+		return None
+	mean_x = sum(x for x, y in points) / len(points)
+	mean_y = sum(y for x, y in points) / len(points)
+	return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, y in points)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmark the hot paths of the terminal games')
+	parser.add_argument('filter', nargs='*', help='only run benchmarks with one of these words in their name')
+	parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: benchmark.json)')
+	parser.add_argument('--save', action='store_true', help='store the results in the baseline file')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline (default: 0.25)')
+	parser.add_argument('--min-time', type=float, default=0.2, help='seconds per repeat (default: 0.2)')
+	parser.add_argument('--repeats', type=int, default=3, help='repeats per benchmark, the best counts (default: 3)')
+	args = parser.parse_args()
+
+	fake = fake_curses()
+	for game in (color_wars, framebuffer, snake):
+		game.curses = fake
+
+	baseline = {}
+	if os.path.exists(args.baseline):
+		with open(args.baseline) as handle:
+			baseline = json.load(handle).get('results', {})
+
+	results = {}
+	regressions = []
+	print('{:<38} {:>6} {:>14} {:>14} {:>8}'.format('Benchmark', 'Size', 'Rate', 'Baseline', 'Change'))
+	for name, unit, sizes, setup in BENCHMARKS:
+		if args.filter and not any(word in name for word in args.filter):
+			continue
+
+		rates = []
+		for size in sizes:
+			key = name if size is None else '{}[{}]'.format(name, size)
+			run = setup(size)
+			try:
+				rate = measure(run, args.min_time, args.repeats)
+				results[key] = rate
+				if size is not None:
+					rates.append((size, rate))
+
+				line = '{:<38} {:>6} {:>8.0f} {:<5}'.format(name, size or '', rate, unit + '/s')
+				if key in baseline:
+					change = rate / baseline[key] - 1
+					line += ' {:>14.0f} {:>+7.1f}%'.format(baseline[key], change * 100)
+					if change < -args.tolerance:
+						regressions.append((key, change))
+						line += ' REGRESSION'
+				print(line)
+
+				# What the frame buffers wrote per frame, not counting the first
+				# frame that paints everything
+				for buffer in getattr(run, 'buffers', ()):
+					frames = max(1, buffer.frames - 1)
+					print('{:<38} {:.0f} of {} cells in {:.0f} runs, {:.0f} bytes per frame'.format(
+						'', buffer.total_cells / frames, buffer.rows * buffer.colls, buffer.total_runs / frames,
+						buffer.total_bytes / frames
+					))
+					buffer.total_cells = buffer.total_runs = buffer.total_bytes = buffer.frames = 0
+				spectators = getattr(run, 'spectators', None)
+				if spectators:
+					print('{:<38} {:.1f}us publish per frame, {} keyframes, {} frames dropped'.format(
+						'', spectators.time * 1e6 / spectators.frames, spectators.keyframes, spectators.dropped
+					))
+			finally:
+				# Sockets and files of the benchmark
+				if hasattr(run, 'close'):
+					run.close()
+			sys.stdout.flush()
+
+		exponent = scaling_exponent(rates)
+		if exponent is not None:
+			print('{:<38} time per {} grows with size^{:.2f}'.format('', unit[:-1], exponent))
+
+	if args.save:
+		saved = {}
+		if os.path.exists(args.baseline):
+			with open(args.baseline) as handle:
+				saved = json.load(handle)
+		saved.setdefault('results', {}).update(results)
+		saved['python'] = sys.version.split()[0]
+		with open(args.baseline, 'w') as handle:
+			json.dump(saved, handle, indent=1, sort_keys=True)
+		print('Saved {} results to {}'.format(len(results), args.baseline))
+
+	if regressions:
+		print()
+		for key, change in regressions:
+			print('{} is {:.1f}% slower than the baseline'.format(key, -change * 100))
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,5 @@
+# Small games to play in the terminal
+#
+# Importing the package or one of its games has no side effects, the games
+# start from their main() functions. The terminal-games launcher imports
+# only the game that is picked.
@@ -0,0 +1,1390 @@
+#!/usr/bin/env python3
+# Terminal game ColorWar
+# Copyright (C) 2017 Maikel Martens
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import curses
+import random
+import math
+import time
+import argparse
+import os
+import copy
+import heapq
+import threading
+from collections import OrderedDict, defaultdict, deque
+from itertools import compress
+
+from .framebuffer import FrameBuffer, half_blocks
+from .replay import digest
+from .screen import ScreenGame, add_arguments, run
+from .tracing import span, traced
+
+try:
+	popcount = int.bit_count
+except AttributeError:
+	# Python < 3.10
+	def popcount(mask):
+		return bin(mask).count('1')
+
+
+# Feature keys for Zobrist hashing, derived with splitmix64 so no table of
+# field_size * field_size random numbers has to be kept per board
+def zobrist_key(feature):
+	z = (feature * 0x9E3779B97F4A7C15 + 0x2545F4914F6CDD1D) & 0xFFFFFFFFFFFFFFFF
+	z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+	z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+	return z ^ (z >> 31)
+
+curses.COLOR_BLUE
+curses.COLOR_CYAN
+curses.COLOR_GREEN
+curses.COLOR_MAGENTA
+curses.COLOR_RED
+curses.COLOR_YELLOW
+
+
+class Colors:
+	BLUE = 1
+	CYAN = 2
+	GREEN = 3
+	MAGENTA = 4
+	RED = 5
+	YELLOW = 6
+
+	COLORS = [BLUE, CYAN, GREEN, MAGENTA, RED, YELLOW]
+
+
+class BitBoard:
+	# A set of cells stored as the bits of one int, cell (row, coll) is bit
+	# row * field_size + coll. All operations work on whole sets of cells.
+
+	def __init__(self, field_size):
+		self.field_size = field_size
+		self.full = (1 << (field_size * field_size)) - 1
+
+		first_coll = 0
+		for row in range(field_size):
+			first_coll |= 1 << (row * field_size)
+		self.not_first_coll = self.full & ~first_coll
+		self.not_last_coll = self.full & ~(first_coll << (field_size - 1))
+
+	def bit(self, row, coll):
+		if 0 <= row < self.field_size and 0 <= coll < self.field_size:
+			return 1 << (row * self.field_size + coll)
+		return 0
+
+	def neighbors(self, mask):
+		# Shift up, down, left and right, masking the cells that wrapped around a row
+		return (
+			(mask >> self.field_size)
+			| (mask << self.field_size)
+			| ((mask >> 1) & self.not_last_coll)
+			| ((mask << 1) & self.not_first_coll)
+		) & self.full & ~mask
+
+	def flood(self, seed, region):
+		filled = front = seed & region
+		while front:
+			front = self.neighbors(front) & region & ~filled
+			filled |= front
+		return filled
+
+	def links(self, regions):
+		# Per direction the cells that share a region with their neighbor below,
+		# above, to the right and to the left. Used to flood several disjoint
+		# regions at once without leaking from one region into another.
+		up = down = left = right = 0
+		for mask in regions:
+			up |= mask & (mask >> self.field_size)
+			down |= mask & (mask << self.field_size)
+			left |= mask & (mask >> 1) & self.not_last_coll
+			right |= mask & (mask << 1) & self.not_first_coll
+		return up, down & self.full, left, right
+
+	def flood_linked(self, seed, region, links):
+		up, down, left, right = links
+		filled = front = seed & region
+		while front:
+			front = (
+				((front >> self.field_size) & up)
+				| ((front << self.field_size) & down)
+				| ((front >> 1) & left)
+				| ((front << 1) & right)
+			) & region & ~filled
+			filled |= front
+		return filled
+
+	def indexes(self, mask):
+		if popcount(mask) > 64:
+			# Finding the bits in a string is faster once there are many
+			bits = format(mask, 'b')[::-1]
+			index = bits.find('1')
+			while index >= 0:
+				yield index
+				index = bits.find('1', index + 1)
+			return
+
+		while mask:
+			low = mask & -mask
+			yield low.bit_length() - 1
+			mask ^= low
+
+	def pack(self, mask):
+		return mask.to_bytes((self.full.bit_length() + 7) // 8, 'little')
+
+	def row_bits(self, packed, row, coll, width):
+		# Bits of width cells from (row, coll) out of a packed mask, only the
+		# bytes that hold them are converted
+		start = row * self.field_size + coll
+		value = int.from_bytes(packed[start >> 3:((start + width) >> 3) + 1], 'little')
+		return (value >> (start & 7)) & ((1 << width) - 1)
+
+	@staticmethod
+	def count(mask):
+		return popcount(mask)
+
+
+class Player:
+	def __init__(self, number, color, board):
+		self.number = number
+		self.color = color
+		self.board = board
+		self.cells = 0
+
+	@property
+	def cell_count(self):
+		return BitBoard.count(self.cells)
+
+	def has_cell(self, row, coll):
+		return bool(self.cells & self.board.bit(row, coll))
+
+	def add_cell(self, row, coll):
+		self.cells |= self.board.bit(row, coll)
+
+	def zobrist_cells(self, mask):
+		key = 0
+		for index in self.board.indexes(mask):
+			key ^= zobrist_key(32 + index * 2 + self.number - 1)
+		return key
+
+	def zobrist_color(self):
+		return zobrist_key(self.number * 8 + self.color)
+
+	# Flood the free cells with the current color from the border of our
+	# territory, returns the gained cells
+	def qonquer_cells(self, colors, other_player):
+		region = colors[self.color] & ~other_player.cells & ~self.cells
+		gained = self.board.flood(self.board.neighbors(self.cells), region)
+		self.cells |= gained
+		return gained
+
+	def pick_color(self, state, window):
+		return int(window.getkey())
+
+
+class SearchAborted(Exception):
+	pass
+
+
+class Search:
+	# Negamax alpha-beta search with iterative deepening over GameState.make_move
+	# and GameState.unmake_move, searched positions are kept in a bounded
+	# transposition table keyed by the Zobrist hash of the state.
+
+	WIN = 1 << 20
+	INFINITY = 1 << 30
+
+	EXACT = 0
+	LOWER = 1
+	UPPER = 2
+
+	def __init__(self, table_size=1 << 16):
+		self.table_size = table_size
+		self.table = OrderedDict()
+		self.stop = False
+		self.deadline = None
+		self.node_limit = None
+		self.nodes = 0
+		self.stats = None
+
+	def best_move(self, state, max_depth=64, time_limit=None, node_limit=None):
+		start = time.perf_counter()
+		self.deadline = start + time_limit if time_limit else None
+		self.node_limit = node_limit
+		self.nodes = 0
+		self.stop = False
+
+		best_color = None
+		best_score = 0
+		depth = 0
+		for depth in range(1, max_depth + 1):
+			try:
+				score, color = self.search_root(state, depth)
+			except SearchAborted:
+				depth -= 1
+				break
+
+			best_score, best_color = score, color
+			if abs(score) >= self.WIN:
+				break
+
+		elapsed = time.perf_counter() - start
+		self.stats = {
+			'depth': depth,
+			'nodes': self.nodes,
+			'score': best_score,
+			'time': elapsed,
+			'nps': int(self.nodes / elapsed) if elapsed else 0,
+		}
+
+		if best_color is None:
+			# Not even depth one finished, fall back to the biggest gain
+			best_color = self.ordered_moves(state, None)[0]
+		return best_color
+
+	def search_root(self, state, depth):
+		alpha, beta = -self.INFINITY, self.INFINITY
+		best_color = None
+		entry = self.table.get(state.hash)
+
+		for color in self.ordered_moves(state, entry[3] if entry else None):
+			state.make_move(color)
+			try:
+				score = -self.negamax(state, depth - 1, -beta, -alpha)
+			finally:
+				state.unmake_move()
+
+			if best_color is None or score > alpha:
+				alpha, best_color = score, color
+
+		self.store(state.hash, depth, alpha, self.EXACT, best_color)
+		return alpha, best_color
+
+	def negamax(self, state, depth, alpha, beta):
+		self.nodes += 1
+		if self.nodes & 63 == 0:
+			self.check_limits()
+
+		if state.game_won():
+			return self.game_over_score(state)
+		if depth <= 0:
+			return state.current_player.cell_count - state.other_player.cell_count
+
+		entry = self.table.get(state.hash)
+		if entry:
+			self.table.move_to_end(state.hash)
+			if entry[0] >= depth:
+				if entry[2] == self.EXACT:
+					return entry[1]
+				if entry[2] == self.LOWER and entry[1] >= beta:
+					return entry[1]
+				if entry[2] == self.UPPER and entry[1] <= alpha:
+					return entry[1]
+
+		original_alpha = alpha
+		best_score = -self.INFINITY
+		best_color = None
+		for color in self.ordered_moves(state, entry[3] if entry else None):
+			state.make_move(color)
+			try:
+				score = -self.negamax(state, depth - 1, -beta, -alpha)
+			finally:
+				state.unmake_move()
+
+			if score > best_score:
+				best_score, best_color = score, color
+			alpha = max(alpha, score)
+			if alpha >= beta:
+				break
+
+		if best_score <= original_alpha:
+			flag = self.UPPER
+		elif best_score >= beta:
+			flag = self.LOWER
+		else:
+			flag = self.EXACT
+		self.store(state.hash, depth, best_score, flag, best_color)
+		return best_score
+
+	def ordered_moves(self, state, first):
+		# Moves that gain cells, biggest gain first. When no color gains
+		# anything the player still has to pick one, so one move is returned.
+		gains = state.color_gains(state.current_player)
+		colors = [color for color in Colors.COLORS if state.color_free(color)]
+		colors.sort(key=lambda color: (color != first, -gains[color]))
+
+		moves = [color for color in colors if gains[color]]
+		return moves or colors[:1]
+
+	def game_over_score(self, state):
+		difference = state.current_player.cell_count - state.other_player.cell_count
+		if difference > 0:
+			return self.WIN + difference
+		if difference < 0:
+			return -self.WIN + difference
+		return 0
+
+	def check_limits(self):
+		if self.stop:
+			raise SearchAborted()
+		if self.deadline and time.perf_counter() >= self.deadline:
+			raise SearchAborted()
+		if self.node_limit and self.nodes >= self.node_limit:
+			raise SearchAborted()
+
+	def store(self, key, depth, score, flag, color):
+		self.table[key] = (depth, score, flag, color)
+		self.table.move_to_end(key)
+		if len(self.table) > self.table_size:
+			self.table.popitem(last=False)
+
+
+class Regions:
+	# Connected areas of one color on the field and the areas they touch. The
+	# field never changes during a game and players always take whole areas.
+
+	def __init__(self, field):
+		field_size = len(field)
+		cells = b''.join(field)
+
+		self.labels = [-1] * len(cells)
+		self.colors = []
+		self.sizes = []
+		self.neighbors = []
+
+		for start in range(len(cells)):
+			if self.labels[start] >= 0:
+				continue
+
+			region = len(self.sizes)
+			color = cells[start]
+			size = 0
+			self.labels[start] = region
+			stack = [start]
+			while stack:
+				index = stack.pop()
+				size += 1
+				coll = index % field_size
+				for neighbor in (
+					index - field_size if index >= field_size else -1,
+					index + field_size if index + field_size < len(cells) else -1,
+					index - 1 if coll > 0 else -1,
+					index + 1 if coll + 1 < field_size else -1,
+				):
+					if neighbor >= 0 and self.labels[neighbor] < 0 and cells[neighbor] == color:
+						self.labels[neighbor] = region
+						stack.append(neighbor)
+
+			self.colors.append(color)
+			self.sizes.append(size)
+			self.neighbors.append(set())
+
+		labels = self.labels
+		for index in range(len(cells)):
+			region = labels[index]
+			if index % field_size + 1 < field_size and labels[index + 1] != region:
+				self.neighbors[region].add(labels[index + 1])
+				self.neighbors[labels[index + 1]].add(region)
+			if index + field_size < len(cells) and labels[index + field_size] != region:
+				self.neighbors[region].add(labels[index + field_size])
+				self.neighbors[labels[index + field_size]].add(region)
+
+	def of_cells(self, board, mask):
+		return set(self.labels[index] for index in board.indexes(mask))
+
+
+class BorderIndex:
+	# The free areas that touch the territory of a player, with the total size
+	# per color. It is updated from the cells that changed owner since the
+	# last sync, so it is only rebuilt when a new game started.
+
+	def __init__(self):
+		self.regions = None
+		self.cells = 0
+		self.other_cells = 0
+		self.claimed = set()
+		self.border = set()
+		self.gains = dict((color, 0) for color in Colors.COLORS)
+
+	def sync(self, state, player):
+		other_player = state.other_player if player is state.current_player else state.current_player
+
+		if state.regions is not self.regions or self.cells & ~player.cells or self.other_cells & ~other_player.cells:
+			self.__init__()
+			self.regions = state.regions
+
+		for region in self.regions.of_cells(player.board, player.cells & ~self.cells):
+			self.claim(region)
+			for neighbor in self.regions.neighbors[region]:
+				if neighbor not in self.claimed and neighbor not in self.border:
+					self.border.add(neighbor)
+					self.gains[self.regions.colors[neighbor]] += self.regions.sizes[neighbor]
+
+		for region in self.regions.of_cells(player.board, other_player.cells & ~self.other_cells):
+			self.claim(region)
+
+		self.cells = player.cells
+		self.other_cells = other_player.cells
+		return self.gains
+
+	def claim(self, region):
+		self.claimed.add(region)
+		if region in self.border:
+			self.border.remove(region)
+			self.gains[self.regions.colors[region]] -= self.regions.sizes[region]
+
+
+class BotPlayer(Player):
+	# Search limits per difficulty level, easy picks the biggest gain without
+	# searching
+	LEVELS = {
+		'easy': None,
+		'normal': {'node_limit': 5000},
+		'hard': {'time_limit': 1.0},
+	}
+
+	def __init__(self, number, color, board, level='normal'):
+		super().__init__(number, color, board)
+		self.level = level
+		self.search = Search()
+		self.border = BorderIndex()
+
+	@classmethod
+	def create_bot(self, player, level='normal'):
+		bot = BotPlayer(player.number, player.color, player.board, level)
+		bot.cells = player.cells
+		return bot
+
+	def evaluate_colors(self, state):
+		return self.border.sync(state, self)
+
+	@traced('bot')
+	def pick_color(self, state, window):
+		if self.LEVELS[self.level] is None:
+			gains = self.evaluate_colors(state)
+			colors = [color for color in Colors.COLORS if state.color_free(color)]
+			return max(colors, key=lambda color: gains[color])
+
+		return self.search.best_move(state, **self.LEVELS[self.level])
+
+
+class GameState:
+	# levels has the bot level of player 1 and 2, None for a human player
+	def __init__(self, field_size, levels=(None, 'normal'), seed=None):
+		self.field_size = field_size
+		self.levels = levels
+		self.random = random.Random(seed)
+		self.board = BitBoard(field_size)
+		self.current_player = None
+		self.other_player = None
+		self.field = None
+		self.colors = None
+		self.links = None
+		self.field_cache = None
+		self.hash = 0
+		self.history = []
+		# Moves played since the reset
+		self.moves = 0
+
+		self.reset()
+
+	def reset(self):
+		self.current_player, self.other_player = self.generate_players()
+
+		self.field = [bytearray(self.field_size) for row in range(self.field_size)]
+		for row in range(self.field_size):
+			for col in range(self.field_size):
+				self.field[row][col] = self.generate_random_color()
+
+		# Set the start colors, a player without a color is not in the game
+		players = [player for player in (self.current_player, self.other_player) if player.color is not None]
+		for player in players:
+			row, coll = (self.field_size - 1, 0) if player.number == 1 else (0, self.field_size - 1)
+			self.field[row][coll] = player.color
+			player.add_cell(row, coll)
+
+		# Bitmask of the cells per field color
+		cells = b''.join(self.field)
+		self.colors = {}
+		for color in Colors.COLORS:
+			table = bytes(ord('1') if value == color else ord('0') for value in range(256))
+			self.colors[color] = int(cells.translate(table)[::-1], 2)
+		self.links = self.board.links(self.colors.values())
+		self.field_cache = {}
+
+		# check if also has nearby fields
+		for player in players:
+			player.qonquer_cells(self.colors, self.other_player if player is self.current_player else self.current_player)
+
+		self.history = []
+		self.moves = 0
+		self.hash = 0
+		for player in players:
+			self.hash ^= player.zobrist_color() ^ player.zobrist_cells(player.cells)
+
+	@property
+	def regions(self):
+		# Only labelled when a bot needs them, copies of the state share them
+		if 'regions' not in self.field_cache:
+			self.field_cache['regions'] = Regions(self.field)
+		return self.field_cache['regions']
+
+	# Snapshot for a bot to think on, the field is shared and only the players
+	# are copied
+	def copy(self):
+		state = copy.copy(self)
+		state.current_player = copy.copy(self.current_player)
+		state.other_player = copy.copy(self.other_player)
+		state.history = []
+		return state
+
+	def qonquer_cells(self):
+		return self.current_player.qonquer_cells(self.colors, self.other_player)
+
+	# Pick a color for the current player and hand the turn to the other
+	# player, the previous state is kept so the move can be taken back
+	def make_move(self, color):
+		player = self.current_player
+		self.history.append((player.color, player.cells, self.hash))
+		return self.apply_move(color)
+
+	# A move that is not taken back, for games and replays. Nothing is kept,
+	# a snapshot of a big board is a big int.
+	def apply_move(self, color):
+		player = self.current_player
+		self.hash ^= player.zobrist_color()
+		player.color = color
+		self.hash ^= player.zobrist_color()
+
+		gained = self.qonquer_cells()
+		self.hash ^= player.zobrist_cells(gained) ^ zobrist_key(0)
+		self.switch_players()
+		self.moves += 1
+		return gained
+
+	def unmake_move(self):
+		self.switch_players()
+		player = self.current_player
+		player.color, player.cells, self.hash = self.history.pop()
+		self.moves -= 1
+
+	# Exact number of cells the player gains for every color, all colors are
+	# flooded in one pass over the same-color links of the free cells
+	def color_gains(self, player):
+		free = self.free_cells()
+		gained = self.board.flood_linked(self.board.neighbors(player.cells), free, self.links)
+		return dict((color, BitBoard.count(gained & self.colors[color])) for color in Colors.COLORS)
+
+	def game_won(self):
+		max_cells = self.field_size * self.field_size
+		
+		if self.current_player.cell_count + self.other_player.cell_count >= max_cells:
+			return True
+
+		if self.current_player.cell_count + self.other_player.cell_count >= (max_cells * 0.9):
+			if self.current_player.cell_count > (max_cells / 2):
+				return True
+			if self.other_player.cell_count > (max_cells / 2):
+				return True
+			pass
+
+		return False
+
+	def player_won(self):
+		max_cells = self.field_size * self.field_size
+		
+		if self.current_player.cell_count > (max_cells / 2):
+				return self.current_player
+		if self.other_player.cell_count > (max_cells / 2):
+			return self.other_player
+
+		return None
+
+	def cell_free(self, row, coll):
+		return not (self.current_player.cells | self.other_player.cells) & self.board.bit(row, coll)
+
+	def free_cells(self):
+		return self.board.full & ~(self.current_player.cells | self.other_player.cells)
+
+	def color_free(self, color):
+		return not (self.current_player.color == color or color == self.other_player.color)
+
+	def switch_players(self):
+		self.current_player, self.other_player = self.other_player, self.current_player
+
+	def generate_players(self):
+		player = self.generate_player(1, [])
+		return player, self.generate_player(2, [player.color])
+
+	def generate_player(self, number, colors_taken):
+		while True:
+			player = Player(number, self.generate_random_color(), self.board)
+			if player.color not in colors_taken:
+				break
+
+		if self.levels[number - 1]:
+			return BotPlayer.create_bot(player, self.levels[number - 1])
+		return player
+
+	def generate_random_color(self):
+		return self.random.choice(Colors.COLORS)
+
+
+# Flood-It puzzle
+# -----------------------------------------------------------------------------
+
+class FloodIt:
+	# Flood-It on the region graph of a field. A flooded area is a bitmask of
+	# region numbers with its border, the regions next to it. A move floods
+	# the border regions of one color.
+
+	def __init__(self, field, start):
+		regions = Regions(field)
+		self.full = (1 << len(regions.sizes)) - 1
+		self.neighbors = [sum(1 << neighbor for neighbor in neighbors) for neighbors in regions.neighbors]
+		self.colors = dict((color, 0) for color in Colors.COLORS)
+		for region, color in enumerate(regions.colors):
+			self.colors[color] |= 1 << region
+		self.start = regions.labels[start]
+
+		# The neighbors of every combination of 8 regions, per byte of a mask
+		self.size = (len(self.neighbors) + 7) // 8
+		self.tables = []
+		for offset in range(0, self.size * 8, 8):
+			table = [0] * 256
+			for byte in range(1, 256):
+				low = byte & -byte
+				region = offset + low.bit_length() - 1
+				table[byte] = table[byte ^ low] | (self.neighbors[region] if region < len(self.neighbors) else 0)
+			self.tables.append(table)
+
+		self.solution = None
+		self.optimal = False
+		self.nodes = 0
+		self.time = 0
+
+	def initial(self):
+		return 1 << self.start, self.neighbors[self.start]
+
+	# Regions next to the regions of a mask, only the bytes of the mask that
+	# have regions are looked up
+	def reach(self, mask):
+		data = mask.to_bytes(self.size, 'little')
+		reach = 0
+		for table, byte in compress(zip(self.tables, data), data):
+			reach |= table[byte]
+		return reach
+
+	def move(self, flooded, border, color):
+		gained = border & self.colors[color]
+		flooded |= gained
+		return flooded, (border | self.reach(gained)) & ~flooded
+
+	# Lower bound of the moves left. Every move floods one color, so every
+	# color that is left takes a move. A move also only reaches one region
+	# further, so it takes a move per step to the farthest region.
+	def heuristic(self, flooded, border):
+		remaining = self.full & ~flooded
+		colors = 0
+		for mask in self.colors.values():
+			if mask & remaining:
+				colors += 1
+
+		distance = 0
+		seen = flooded
+		front = border
+		while front:
+			distance += 1
+			seen |= front
+			if seen == self.full:
+				break
+			front = self.reach(front) & ~seen
+		return max(colors, distance)
+
+	def path(self, parents, flooded):
+		moves = []
+		while parents[flooded]:
+			flooded, color = parents[flooded]
+			moves.append(color)
+		return moves[::-1]
+
+	# Keeps the width areas with the fewest moves left after every move,
+	# areas that were reached before are skipped
+	def beam(self, width):
+		flooded, border = self.initial()
+		if flooded == self.full:
+			return []
+		states = [(flooded, border)]
+		parents = {flooded: None}
+		while True:
+			candidates = []
+			for flooded, border in states:
+				for color in Colors.COLORS:
+					if not border & self.colors[color]:
+						continue
+					new, new_border = self.move(flooded, border, color)
+					if new in parents:
+						continue
+					parents[new] = (flooded, color)
+					if new == self.full:
+						return self.path(parents, new)
+					self.nodes += 1
+					candidates.append((self.heuristic(new, new_border), -popcount(new), new, new_border))
+			candidates.sort()
+			states = [(new, new_border) for h, size, new, new_border in candidates[:width]]
+
+	# Shortest solution with less than bound moves, None when there is none
+	# and False when the deadline passed
+	def astar(self, bound, deadline):
+		flooded, border = self.initial()
+		heap = [(self.heuristic(flooded, border), 0, flooded, border)]
+		best = {flooded: 0}
+		parents = {flooded: None}
+		while heap:
+			f, moves, flooded, border = heapq.heappop(heap)
+			if moves > best[flooded]:
+				continue
+			if flooded == self.full:
+				return self.path(parents, flooded)
+
+			self.nodes += 1
+			if self.nodes & 31 == 0 and time.perf_counter() > deadline:
+				return False
+			for color in Colors.COLORS:
+				if not border & self.colors[color]:
+					continue
+				new, new_border = self.move(flooded, border, color)
+				if moves + 1 >= best.get(new, bound):
+					continue
+				h = self.heuristic(new, new_border)
+				if moves + 1 + h >= bound:
+					continue
+				best[new] = moves + 1
+				parents[new] = (flooded, color)
+				heapq.heappush(heap, (moves + 1 + h, moves + 1, new, new_border))
+		return None
+
+	# Beam searches of doubling width while the next one fits in the time,
+	# then A* below the best of them with the time that is left. When A*
+	# finishes the solution is optimal.
+	def solve(self, time_limit=1.0):
+		start = time.perf_counter()
+		deadline = start + time_limit
+		solution = None
+		width = 4
+		while True:
+			started = time.perf_counter()
+			moves = self.beam(width)
+			if solution is None or len(moves) < len(solution):
+				solution = moves
+			now = time.perf_counter()
+			if now + (now - started) * 2 > deadline or width > self.full.bit_length():
+				break
+			width *= 2
+
+		moves = self.astar(len(solution), deadline)
+		if moves is not False:
+			self.optimal = True
+			solution = moves or solution
+		self.time = time.perf_counter() - start
+		self.solution = solution
+		return solution
+
+
+class PuzzleState(GameState):
+	# One player floods the whole field from the bottom left corner, the other
+	# player owns nothing and never moves
+
+	def generate_players(self):
+		# Player 2 is not in the puzzle, its color is still drawn so a seed
+		# gives the same field as in a game
+		player, other_player = super().generate_players()
+		return player, Player(2, None, self.board)
+
+	@property
+	def solver(self):
+		if 'solver' not in self.field_cache:
+			solver = FloodIt(self.field, (self.field_size - 1) * self.field_size)
+			solver.solve()
+			self.field_cache['solver'] = solver
+		return self.field_cache['solver']
+
+	@property
+	def par(self):
+		return len(self.solver.solution)
+
+	def switch_players(self):
+		pass
+
+	def game_won(self):
+		return self.current_player.cells == self.board.full
+
+	def player_won(self):
+		return self.current_player if self.game_won() else None
+
+
+class GameEngine(ScreenGame):
+	FIELD_SIZE = 25
+
+	COLOR_PAIRS = {
+		Colors.BLUE: (curses.COLOR_WHITE, curses.COLOR_BLUE),
+		Colors.CYAN: (curses.COLOR_WHITE, curses.COLOR_CYAN),
+		Colors.GREEN: (curses.COLOR_WHITE, curses.COLOR_GREEN),
+		Colors.MAGENTA: (curses.COLOR_WHITE, curses.COLOR_MAGENTA),
+		Colors.RED: (curses.COLOR_WHITE, curses.COLOR_RED),
+		Colors.YELLOW: (curses.COLOR_WHITE, curses.COLOR_YELLOW),
+	}
+
+	# Colors of the cells with half blocks by color number, 0 is the background
+	HALF_BLOCK_COLORS = [
+		curses.COLOR_BLACK, curses.COLOR_BLUE, curses.COLOR_CYAN, curses.COLOR_GREEN,
+		curses.COLOR_MAGENTA, curses.COLOR_RED, curses.COLOR_YELLOW,
+	]
+
+	def __init__(self, level='normal', field_size=FIELD_SIZE, seed=None, recorder=None, replay=None, puzzle=False, half_blocks=False):
+		self.puzzle = puzzle
+		if puzzle:
+			self.state = PuzzleState(field_size, (None, None), seed)
+		else:
+			self.state = GameState(field_size, (None, level), seed)
+
+		# Moves are written to the recorder, or come from the replay
+		self.moves = 0
+		self.recorder = recorder
+		self.replay = replay
+		self.playback = deque(replay.inputs) if replay else None
+		# Broadcaster that publishes the field to spectators
+		self.spectators = None
+
+		# Viewport, the board cell at the top left and the cells per screen cell
+		self.view_row = 0
+		self.view_coll = 0
+		self.zoom = 1
+
+		# Draw two rows of cells per line with half blocks
+		self.half_blocks = half_blocks
+		self.blocks = None
+
+	@classmethod
+	def create(cls, settings, seed, half_blocks, recorder=None, replay=None):
+		return cls(settings['level'], settings['size'], seed, recorder, replay, settings.get('puzzle', False), half_blocks)
+
+	def start(self):
+		self.layout()
+
+		curses.curs_set(0)
+
+		if self.half_blocks:
+			self.blocks = half_blocks(self.HALF_BLOCK_COLORS)
+
+		self.reset_view()
+
+	def replay_finished(self):
+		self.render_action('Replay finished, hit a key to quit')
+		self.render_field()
+		curses.doupdate()
+		self.getkey()
+
+	@property
+	def step(self):
+		return self.moves
+
+	# Everything the replay of a game has to end with
+	def digest(self):
+		return state_digest(self.state, self.moves)
+
+	def layout(self):
+		screen_rows, screen_colls = self.window.getmaxyx()
+
+		# The field gets what is left after the action and color windows, the
+		# pad only holds the visible part so big boards cost no extra memory.
+		# With half blocks a line shows two rows of one character wide cells.
+		if self.half_blocks:
+			self.view_rows = max(1, min(self.state.field_size, (screen_rows - 6) * 2))
+			self.view_colls = max(1, min(self.state.field_size, screen_colls - 2))
+			lines, colls = (self.view_rows + 1) // 2, self.view_colls + 2
+		else:
+			self.view_rows = max(1, min(self.state.field_size, screen_rows - 6))
+			self.view_colls = max(1, min(self.state.field_size, (screen_colls - 2) // 2))
+			lines, colls = self.view_rows, self.view_colls * 2 + 2
+		self.wfield = curses.newpad(lines + 1, colls)
+		self.waction = curses.newwin(1, 80, lines + 1, 0)
+		self.wcolors = curses.newwin(3, 80, lines + 3, 0)
+
+		# Frames are drawn in buffers that only write what changed
+		self.field_buffer = FrameBuffer(self.wfield, lines + 1, colls, (0, 0, 0, 0, lines, colls - 1))
+		self.action_buffer = FrameBuffer(self.waction, 1, 80)
+		self.colors_buffer = FrameBuffer(self.wcolors, 3, 80)
+
+		self.window.clear()
+		self.window.refresh()
+		self.move_view(0, 0)
+
+	def reset_view(self):
+		# Start at the bottom left, where player 1 starts
+		self.zoom = 1
+		self.view_coll = 0
+		self.view_row = self.state.field_size
+		self.move_view(0, 0)
+
+	def move_view(self, rows, colls):
+		max_row = max(0, self.state.field_size - self.view_rows * self.zoom)
+		max_coll = max(0, self.state.field_size - self.view_colls * self.zoom)
+		self.view_row = min(max(0, self.view_row + rows), max_row)
+		self.view_coll = min(max(0, self.view_coll + colls), max_coll)
+
+	def zoom_view(self, zoom):
+		# Zoom out until the whole board fits, keep the center of the view in place
+		fit = max(1, -(-self.state.field_size // min(self.view_rows, self.view_colls)))
+		zoom = min(max(1, zoom), 1 << (fit - 1).bit_length())
+
+		center_row = self.view_row + self.view_rows * self.zoom // 2
+		center_coll = self.view_coll + self.view_colls * self.zoom // 2
+		self.zoom = zoom
+		self.view_row = center_row - self.view_rows * zoom // 2
+		self.view_coll = center_coll - self.view_colls * zoom // 2
+		self.move_view(0, 0)
+
+	# Used by the human player to read a key, view keys are handled here
+	def getkey(self):
+		while True:
+			key = self.window.getkey()
+			if not self.view_key(key):
+				return key
+
+	def view_key(self, key):
+		if key == 'KEY_UP':
+			self.move_view(-max(1, self.view_rows * self.zoom // 2), 0)
+		elif key == 'KEY_DOWN':
+			self.move_view(max(1, self.view_rows * self.zoom // 2), 0)
+		elif key == 'KEY_LEFT':
+			self.move_view(0, -max(1, self.view_colls * self.zoom // 2))
+		elif key == 'KEY_RIGHT':
+			self.move_view(0, max(1, self.view_colls * self.zoom // 2))
+		elif key == '+':
+			self.zoom_view(self.zoom // 2)
+		elif key == '-':
+			self.zoom_view(self.zoom * 2)
+		elif key == 'KEY_RESIZE':
+			self.layout()
+			self.render_action()
+		else:
+			return False
+
+		self.render_field()
+		self.render_colors()
+		curses.doupdate()
+		return True
+
+	# Let the bot search on a snapshot of the state in a thread, meanwhile the
+	# screen stays responsive and M makes the bot move with what it found so far
+	def think(self):
+		snapshot = self.state.copy()
+		bot = snapshot.current_player
+		result = []
+		errors = []
+
+		# An error of the bot is raised here once the thread ended, not
+		# printed over the screen
+		def search():
+			try:
+				result.append(bot.pick_color(snapshot, None))
+			except Exception as error:
+				errors.append(error)
+
+		thread = threading.Thread(target=search)
+		thread.daemon = True
+		start = time.perf_counter()
+		thread.start()
+
+		self.window.timeout(100)
+		try:
+			while thread.is_alive():
+				self.render_action('Player {} is thinking {:.1f}s, hit M to move now or Q to quit'.format(
+					bot.number, time.perf_counter() - start
+				))
+				curses.doupdate()
+
+				try:
+					key = self.window.getkey()
+				except curses.error:
+					continue
+
+				if key.lower() == 'm':
+					bot.search.stop = True
+				elif key.lower() == 'q':
+					sys.exit(0)
+				else:
+					self.view_key(key)
+		finally:
+			self.window.timeout(-1)
+
+		if errors:
+			raise errors[0]
+		return result[0]
+
+	# Next input of the replay at the time it was made, the view can be moved
+	# while waiting for it
+	def replay_input(self):
+		step, milliseconds, data = self.playback.popleft()
+		try:
+			while True:
+				remaining = self.replay.remaining(milliseconds)
+				if remaining <= 0:
+					return data.decode()
+				self.window.timeout(max(1, min(100, int(remaining * 1000))))
+				try:
+					key = self.window.getkey()
+				except curses.error:
+					continue
+				if key.lower() == 'q':
+					sys.exit(0)
+				self.view_key(key)
+		finally:
+			self.window.timeout(-1)
+
+	def record(self, data):
+		if self.recorder:
+			self.recorder.input(self.moves, data)
+
+	def loop(self):
+		while self.playback is None or self.playback:
+			if self.puzzle and 'solver' not in self.state.field_cache:
+				self.render_action('Finding the par of the puzzle...')
+				curses.doupdate()
+
+			self.render_field()
+			self.render_action()
+			self.render_colors()
+			curses.doupdate()
+
+			try:
+				if self.playback is not None:
+					color = int(self.replay_input())
+				elif isinstance(self.state.current_player, BotPlayer):
+					color = self.think()
+				else:
+					with span('input'):
+						color = self.state.current_player.pick_color(self.state, self)
+			except KeyboardInterrupt:
+				sys.exit(1)
+			except ValueError:
+				# Not a number key
+				continue
+
+			if color not in Colors.COLORS or color == self.state.current_player.color or color == self.state.other_player.color:
+				continue
+
+			# change player color and check cells
+			with span('move'):
+				self.state.apply_move(color)
+			self.moves += 1
+			self.record(str(color))
+
+			if self.state.game_won():
+				player = self.state.player_won()
+				if self.puzzle:
+					solver = self.state.solver
+					self.render_action('Flooded in {} moves, par is {}{}, hit N for a new puzzle!'.format(
+						self.state.moves, self.state.par, '' if solver.optimal else ' or less'
+					))
+				elif player:
+					percent = int(math.ceil((player.cell_count / float(self.state.field_size * self.state.field_size)) * 100))
+					self.render_action('Player {} has won with {}%, hit N to start new game!'.format(player.number, percent))
+				else:
+					self.render_action('Tie (50%), hit N to start new game!')
+
+				self.render_field()
+				curses.doupdate()
+
+				if self.playback is not None:
+					if not self.playback:
+						break
+					self.replay_input()
+				while self.playback is None:
+					try:
+						key = self.getkey()
+
+						if str(key).lower() == 'n':
+							break
+					except KeyboardInterrupt:
+						sys.exit(0)
+				
+				self.record('N')
+				self.state.reset()
+				self.reset_view()
+
+
+	# Render logic
+	# -------------------------------------------------------------------------
+
+	@traced('render_field')
+	def render_field(self):
+		self.field_buffer.clear()
+
+		colors = self.field_colors()
+		if self.half_blocks:
+			# The player numbers don't fit in half a character
+			blocks = self.blocks
+			for line in range((len(colors) + 1) // 2):
+				top = colors[line * 2]
+				bottom = colors[line * 2 + 1] if line * 2 + 1 < len(colors) else [0] * len(top)
+				self.field_buffer.put_cells(line, 0, [blocks[upper][lower] for upper, lower in zip(top, bottom)])
+		else:
+			for screen_row, row_colors in enumerate(colors):
+				for screen_coll, color in enumerate(row_colors):
+					self.field_buffer.put(screen_row, screen_coll * 2, '  ', curses.color_pair(color))
+			self.render_players()
+
+		self.field_buffer.present()
+		if self.spectators:
+			with span('publish'):
+				self.spectators.publish(self.field_buffer)
+
+	# The color of every visible screen cell by row
+	def field_colors(self):
+		state = self.state
+		zoom = self.zoom
+		field_size = state.field_size
+		rows = min(self.view_rows, -(-(field_size - self.view_row) // zoom))
+		colls = min(self.view_colls, -(-(field_size - self.view_coll) // zoom))
+		width = min(colls * zoom, field_size - self.view_coll)
+
+		# Only the visible cells are drawn. When zoomed out a screen cell shows
+		# the most common color of a few sample cells of its block.
+		players = [(player.color, state.board.pack(player.cells)) for player in (state.current_player, state.other_player)]
+		samples = sorted(set([0, zoom // 2, zoom - 1]))
+
+		colors = []
+		for screen_row in range(rows):
+			counts = [defaultdict(int) for screen_coll in range(colls)]
+
+			for sample_row in samples:
+				row = self.view_row + screen_row * zoom + sample_row
+				if row >= field_size:
+					continue
+
+				owners = [(color, state.board.row_bits(cells, row, self.view_coll, width)) for color, cells in players]
+				field_row = state.field[row]
+
+				for screen_coll in range(colls):
+					for sample_coll in samples:
+						offset = screen_coll * zoom + sample_coll
+						if offset >= width:
+							continue
+
+						color = field_row[self.view_coll + offset]
+						for owner_color, bits in owners:
+							if bits >> offset & 1:
+								color = owner_color
+						counts[screen_coll][color] += 1
+
+			colors.append([max(count, key=count.get) for count in counts])
+		return colors
+
+	def render_players(self):
+		field_size = self.state.field_size
+		if self.state.current_player.number == 1:
+			player_1, player_2 = self.state.current_player, self.state.other_player
+		else:
+			player_1, player_2 = self.state.other_player, self.state.current_player
+
+		screen_row, screen_coll = self.screen_position(0, field_size - 1)
+		if screen_row is not None and player_2.color is not None:
+			self.field_buffer.put(screen_row, screen_coll * 2 + 1, '2', curses.color_pair(player_2.color))
+		screen_row, screen_coll = self.screen_position(field_size - 1, 0)
+		if screen_row is not None:
+			self.field_buffer.put(screen_row, screen_coll * 2, '1', curses.color_pair(player_1.color))
+
+	def screen_position(self, row, coll):
+		screen_row = (row - self.view_row) // self.zoom
+		screen_coll = (coll - self.view_coll) // self.zoom
+		if 0 <= screen_row < self.view_rows and 0 <= screen_coll < self.view_colls:
+			return screen_row, screen_coll
+		return None, None
+
+	@traced('render_action')
+	def render_action(self, won_message=None):
+		self.action_buffer.clear()
+		
+		message = 'Player {} choise your color!'.format(self.state.current_player.number)
+		if won_message:
+			message = won_message
+		elif self.puzzle:
+			message = 'Move {}, par {}: choose your color!'.format(self.state.moves + 1, self.state.par)
+		elif isinstance(self.state.other_player, BotPlayer) and self.state.other_player.search.stats:
+			stats = self.state.other_player.search.stats
+			message += ' (bot: depth {}, {} nodes, {} nodes/s)'.format(stats['depth'], stats['nodes'], stats['nps'])
+
+		self.action_buffer.put(0, 0, str(message))
+		self.action_buffer.present()
+
+	@traced('render_colors')
+	def render_colors(self):
+		self.colors_buffer.clear()
+
+		for index, color in enumerate(Colors.COLORS):
+			letter = ' ' if self.state.color_free(color) else '#'
+			for row in range(3):
+				self.colors_buffer.put(row, index * 8, letter * 5, curses.color_pair(color))
+			self.colors_buffer.put(1, index * 8 + 2, str(color), curses.color_pair(color))
+
+		if self.state.field_size > min(self.view_rows, self.view_colls):
+			self.colors_buffer.put(0, 50, 'Arrows: scroll')
+			self.colors_buffer.put(1, 50, '+/-: zoom in/out ({}x)'.format(self.zoom))
+
+		self.colors_buffer.present()
+
+
+# Headless tournament
+# -----------------------------------------------------------------------------
+
+def play_headless(game):
+	seed, field_size, levels = game
+	state = GameState(field_size, levels, seed)
+	start = time.perf_counter()
+
+	# A game where nobody can gain cells anymore would never end
+	moves = 0
+	while not state.game_won() and moves < field_size * field_size:
+		state.apply_move(state.current_player.pick_color(state, None))
+		moves += 1
+
+	player = state.player_won()
+	return levels, player.number if player else None, moves, time.perf_counter() - start
+
+
+def run_tournament(games, field_size, levels, seed, workers):
+	# Every pairing of levels plays with both start positions
+	pairings = [(first, second) for first in levels for second in levels if first != second] or [(levels[0], levels[0])]
+	jobs = [(seed + game, field_size, pairings[game % len(pairings)]) for game in range(games)]
+
+	results = defaultdict(lambda: {'games': 0, 'wins': 0, 'losses': 0, 'ties': 0})
+	total_moves = 0
+	total_time = 0
+	start = time.perf_counter()
+
+	# Imported here, multiprocessing is slow to import and only needed here
+	from concurrent.futures import ProcessPoolExecutor
+	with ProcessPoolExecutor(workers) as executor:
+		for pairing, winner, moves, elapsed in executor.map(play_headless, jobs, chunksize=max(1, games // 256)):
+			total_moves += moves
+			total_time += elapsed
+
+			for number, level in enumerate(pairing, 1):
+				result = results[level if pairing[0] != pairing[1] else '{} (player {})'.format(level, number)]
+				result['games'] += 1
+				if winner is None:
+					result['ties'] += 1
+				elif winner == number:
+					result['wins'] += 1
+				else:
+					result['losses'] += 1
+
+	wall_time = time.perf_counter() - start
+	print('{} games on a {}x{} field in {:.1f}s'.format(games, field_size, field_size, wall_time))
+	print('Average game length: {:.1f} moves'.format(total_moves / float(games)))
+	print('Moves per second: {:.0f} per process, {:.0f} overall'.format(total_moves / total_time, total_moves / wall_time))
+	print()
+	print('{:<20} {:>7} {:>7} {:>7} {:>7} {:>8}'.format('Bot', 'Games', 'Wins', 'Losses', 'Ties', 'Win rate'))
+	for name in sorted(results):
+		result = results[name]
+		print('{:<20} {:>7} {:>7} {:>7} {:>7} {:>7.1f}%'.format(
+			name, result['games'], result['wins'], result['losses'], result['ties'],
+			result['wins'] * 100.0 / result['games']
+		))
+
+
+def solve_puzzles(puzzles, field_size, seed, time_limit):
+	start = time.perf_counter()
+	total_moves = 0
+	optimal = 0
+	slowest = 0
+	for puzzle in range(puzzles):
+		state = PuzzleState(field_size, (None, None), seed + puzzle)
+		solver = state.solver
+
+		# The solution has to flood the field
+		for color in solver.solution:
+			state.apply_move(color)
+		if not state.game_won():
+			raise AssertionError('Solution of puzzle {} does not flood the field'.format(seed + puzzle))
+
+		total_moves += state.par
+		optimal += solver.optimal
+		slowest = max(slowest, solver.time)
+		print('Puzzle {}: par {}{} in {:.2f}s, {} nodes'.format(
+			seed + puzzle, state.par, ' (optimal)' if solver.optimal else '', solver.time, solver.nodes
+		))
+
+	print()
+	print('{} puzzles on a {}x{} field in {:.1f}s, slowest {:.2f}s'.format(puzzles, field_size, field_size, time.perf_counter() - start, slowest))
+	print('Average par {:.1f} moves, {} proven optimal'.format(total_moves / float(puzzles), optimal))
+
+
+# Replays
+# -----------------------------------------------------------------------------
+
+def state_digest(state, moves):
+	players = sorted((player.number, player.color, player.cells) for player in (state.current_player, state.other_player))
+	return digest(moves, state.current_player.number, players, state.hash)
+
+
+# Play a replay at full speed without a screen, the bots are not asked as
+# their moves are in the replay
+def fast_forward(replay):
+	start = time.perf_counter()
+	state = (PuzzleState if replay.settings.get('puzzle') else GameState)(replay.settings['size'], (None, None), replay.seed)
+	moves = 0
+	for step, milliseconds, data in replay.inputs:
+		if data == b'N':
+			state.reset()
+		else:
+			state.apply_move(int(data))
+			moves += 1
+	replay.finish(state_digest(state, moves), time.perf_counter() - start)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Color Wars, conquer the most tiles.')
+	parser.add_argument('--level', choices=sorted(BotPlayer.LEVELS), default='normal', help='strength of the computer player')
+	parser.add_argument('--tournament', type=int, metavar='GAMES', help='play GAMES bot against bot games without a screen')
+	parser.add_argument('--bots', default='easy,normal', help='comma separated bot levels that play the tournament')
+	parser.add_argument('--size', type=int, default=GameEngine.FIELD_SIZE, help='field size, the view scrolls when it does not fit')
+	parser.add_argument('--seed', type=int, help='seed of the game or of the first tournament game, random by default')
+	parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes for the tournament')
+	parser.add_argument('--puzzle', action='store_true', help='play Flood-It alone: flood the whole field in as few moves as you can')
+	parser.add_argument('--solve', type=int, metavar='PUZZLES', help='solve PUZZLES puzzles without a screen and report their par')
+	add_arguments(parser)
+	args = parser.parse_args()
+
+	if args.tournament:
+		levels = args.bots.split(',')
+		for level in levels:
+			if level not in BotPlayer.LEVELS:
+				parser.error('unknown bot level {}'.format(level))
+		run_tournament(args.tournament, args.size, levels, args.seed or 0, args.workers)
+		return
+
+	if args.solve:
+		solve_puzzles(args.solve, args.size, args.seed or 0, 1.0)
+		return
+
+	run(args, 'color-wars', GameEngine, {'level': args.level, 'size': args.size, 'puzzle': args.puzzle}, fast_forward)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,138 @@
+# Double buffered drawing for the curses games
+#
+# A frame is drawn into the back buffer of (character, attribute) cells
+# with put(). present() compares it with the frame that is on the screen
+# and only writes the changed cells, as runs of cells that share a color
+# pair. It only marks the window for refresh, curses.doupdate() then sends
+# the changes of all windows to the terminal in one go.
+
+import curses
+
+BLANK = (' ', 0)
+
+# Half blocks draw two rows of cells in one line of the screen. The upper
+# half block gets the color of the top cell as foreground and the color of
+# the bottom cell as background, so every combination of two colors needs a
+# color pair. They are numbered from HALF_BLOCK_PAIRS on.
+UPPER_HALF = '\u2580'
+HALF_BLOCK_PAIRS = 8
+
+
+def half_block_pairs(colors):
+	pairs = {}
+	for top, fg in enumerate(colors):
+		for bottom, bg in enumerate(colors):
+			pairs[HALF_BLOCK_PAIRS + top * len(colors) + bottom] = (fg, bg)
+	return pairs
+
+
+# (character, attribute) for every top and bottom color index, a cell with
+# two times the same color is a space. The first color is the background of
+# color pair 0, two cells of it are a blank cell that needs no color codes.
+def half_blocks(colors):
+	blocks = [
+		[
+			(' ' if top == bottom else UPPER_HALF, curses.color_pair(HALF_BLOCK_PAIRS + top * len(colors) + bottom))
+			for bottom in range(len(colors))
+		]
+		for top in range(len(colors))
+	]
+	blocks[0][0] = BLANK
+	return blocks
+
+
+class FrameBuffer:
+	def __init__(self, window, rows, colls, refresh=()):
+		self.window = window
+		# Arguments for noutrefresh, a pad needs the part of the screen it covers
+		self.refresh = refresh
+
+		# Counters of the last frame and of all frames
+		self.frames = 0
+		self.cells = 0
+		self.runs = 0
+		self.bytes = 0
+		self.total_cells = 0
+		self.total_runs = 0
+		self.total_bytes = 0
+
+		# A list collects the runs that present() writes, for spectators
+		self.changes = None
+
+		self.resize(rows, colls)
+
+	def resize(self, rows, colls):
+		self.rows = rows
+		self.colls = colls
+		self.back = [[BLANK] * colls for row in range(rows)]
+		self.invalidate()
+
+	# Repaint every cell on the next frame, for when something else drew on
+	# the window or the screen was cleared
+	def invalidate(self):
+		self.front = [[None] * self.colls for row in range(self.rows)]
+
+	def clear(self):
+		self.back = [[BLANK] * self.colls for row in range(self.rows)]
+
+	def put(self, row, coll, text, attr=0):
+		end = coll + len(text)
+		if 0 <= row < self.rows and coll >= 0 and end <= self.colls:
+			self.back[row][coll:end] = [(char, attr) for char in text]
+		elif 0 <= row < self.rows:
+			# Clip what falls outside the window
+			start = max(0, -coll)
+			end = min(len(text), self.colls - coll)
+			if start < end:
+				self.back[row][coll + start:coll + end] = [(char, attr) for char in text[start:end]]
+
+	# Cells that are (character, attribute) already, like from half_blocks()
+	def put_cells(self, row, coll, cells):
+		if 0 <= row < self.rows and 0 <= coll:
+			cells = cells[:self.colls - coll]
+			self.back[row][coll:coll + len(cells)] = cells
+
+	def present(self):
+		cells = runs = size = 0
+		for row in range(self.rows):
+			back = self.back[row]
+			front = self.front[row]
+			if back == front:
+				continue
+
+			coll = 0
+			while coll < self.colls:
+				if back[coll] == front[coll]:
+					coll += 1
+					continue
+
+				# A run of changed cells with the same attribute
+				start = coll
+				attr = back[coll][1]
+				while coll < self.colls and back[coll] != front[coll] and back[coll][1] == attr:
+					coll += 1
+				text = ''.join(char for char, char_attr in back[start:coll])
+				self.draw(row, start, text, attr)
+				if self.changes is not None:
+					self.changes.append((row, start, text, attr))
+				cells += coll - start
+				runs += 1
+				size += len(text.encode())
+
+			self.front[row] = back[:]
+
+		self.window.noutrefresh(*self.refresh)
+		self.frames += 1
+		self.cells = cells
+		self.runs = runs
+		self.bytes = size
+		self.total_cells += cells
+		self.total_runs += runs
+		self.total_bytes += size
+
+	def draw(self, row, coll, text, attr):
+		try:
+			self.window.addstr(row, coll, text, attr)
+		except curses.error:
+			# Writing the bottom right cell moves the cursor out of the window
+			pass
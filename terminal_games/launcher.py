@@ -0,0 +1,60 @@
+# Launcher for the terminal games
+#
+#   terminal-games               menu to pick a game
+#   terminal-games snake --help  start a game with its own options
+#
+# Only the picked game is imported, so the menu comes up right away.
+
+import sys
+import importlib
+
+# Command name, title and module of every game
+GAMES = [
+	('snake', 'Snake', 'terminal_games.snake'),
+	('color-wars', 'Color Wars', 'terminal_games.color_wars'),
+	('pig', 'Pig Dice Game', 'terminal_games.pig'),
+]
+
+
+def choose():
+	print('Terminal Games')
+	print()
+	for number, (name, title, module) in enumerate(GAMES, 1):
+		print('  {}. {:<15} ({})'.format(number, title, name))
+	print()
+
+	while True:
+		try:
+			answer = input('Pick a game (or q to quit): ').strip().lower()
+		except EOFError:
+			return None
+		if answer in ('q', 'quit'):
+			return None
+		for number, (name, title, module) in enumerate(GAMES, 1):
+			if answer in (str(number), name, title.lower()):
+				return name
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	if argv and argv[0] in ('-h', '--help'):
+		print('usage: terminal-games [GAME [OPTIONS]]')
+		print()
+		print('Games: {}. Run terminal-games GAME --help for the options of a game.'.format(', '.join(name for name, title, module in GAMES)))
+		return
+
+	name = argv[0] if argv else choose()
+	if name is None:
+		return
+
+	modules = dict((game, module) for game, title, module in GAMES)
+	if name not in modules:
+		sys.exit('terminal-games: unknown game {!r}, pick one of {}'.format(name, ', '.join(modules)))
+
+	# The game parses its own options
+	sys.argv = ['terminal-games ' + name] + argv[1:]
+	importlib.import_module(modules[name]).main()
+
+
+if __name__ == '__main__':
+	main()
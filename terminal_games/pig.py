@@ -0,0 +1,818 @@
+#!/usr/bin/env python3
+
+"""A dice game modeled after the traditional game Pig"""
+import argparse
+import contextlib
+import itertools
+import json
+import mmap
+import os
+import struct
+import time
+import random
+import sys
+import zlib
+from array import array
+from collections import Counter
+from functools import partial
+
+from .replay import Recorder, Replay, ReplayError, digest, new_seed
+
+GOAL = 100
+
+class Console:
+    """Answers, dice and pauses of the interactive game
+
+    Answers are written to the recorder, or come from the replay. A fast
+    replay does not pause."""
+    def __init__(self, seed=None, recorder=None, replay=None, fast=False):
+        self.random = random.Random(seed)
+        self.recorder = recorder
+        self.replay = replay
+        self.answers = list(reversed(replay.inputs)) if replay else None
+        self.fast = fast
+        self.steps = 0
+        self.players = []
+    def ask(self):
+        """Reads an answer, EOFError when a replay runs out of them"""
+        if self.answers is None:
+            answer = input('>')
+        elif not self.answers:
+            raise EOFError
+        else:
+            step, milliseconds, data = self.answers.pop()
+            if not self.fast:
+                self.replay.wait(milliseconds)
+            answer = data.decode()
+            print('>' + answer)
+        self.steps += 1
+        if self.recorder:
+            self.recorder.input(self.steps, answer)
+        return answer
+    def pause(self, seconds):
+        if not self.fast:
+            time.sleep(seconds)
+    def roll(self):
+        return self.random.randint(1, 6)
+    def digest(self):
+        """Everything the replay of a game has to end with"""
+        return digest(self.steps, [(str(player), player.score()) for player in self.players])
+_CONSOLE = Console()
+
+class Player:
+    """Player Class for the game"""
+    def __init__(self, name, player_id=0):
+        self._name = name
+        self._roll_order = 0
+        self._pid = player_id
+        self._score = 0
+        self._tempscore = 0
+        self._number_rolls = 0
+    def __str__(self):
+        return self._name
+    def __roll_order(self):
+        return self._roll_order
+    def score(self):
+        """returns total score"""
+        return self._score
+    def number_rolls(self):
+        """returns number of rolls"""
+        return self._number_rolls
+    def roll_order(self, roll):
+        """returns the roll order number"""
+        self._roll_order = roll
+    def will_roll(self):
+        """Prompts Player if they want to roll or cash in dice points"""
+        print('Would you like to start to roll or continue rolling?')
+        print('Please enter "y" for yes or "n" for hold your turn.')
+        answer = (_CONSOLE.ask() == 'y')
+        print()
+        if answer:
+            self.dice_roll()
+        elif not answer and self._number_rolls > 0:
+            print(self._name + " holding their turn....")
+            self._score += self._tempscore
+            self._tempscore = 0
+            self._number_rolls = 0
+            print("Current score: ", self._score)
+        else:
+            print("Cannot hold your turn at the before you have rolled at least once.")
+            print("Please choose again.")
+            print()
+            self.will_roll()
+    def dice_roll(self):
+        """Presents the amount before you roll your dice and also rolls the dice"""
+        answer = 0
+        print("************************")
+        print("Total Score: ", self._score)
+        print("Turn Score: ", self._tempscore)
+        print("Times Rolled: ", self._number_rolls)
+        print()
+        _CONSOLE.pause(.5)
+        print("Rolling the dices...")
+        answer = _CONSOLE.roll()
+        print("The values is ", answer)
+        print()
+        self._number_rolls += 1
+        if answer == 1:
+            print("Your score will be emptied, turn ends")
+            print("Total score: ", self._score)
+            _CONSOLE.pause(2)
+            self._tempscore = 0
+            self._number_rolls = 0
+            print()
+        else:
+            self._tempscore += answer
+            self.will_roll()
+
+
+class PigPolicy:
+    """Optimal roll/hold policy for the two player race to the goal
+
+    The table holds the chance to win for every (score, opponent score,
+    turn total) and whether rolling is optimal there. It is solved once,
+    saved to the cache directory and memory mapped on later runs.
+    """
+    MAGIC = b'PIG1'
+    HEADER = struct.Struct('<4sI')
+    def __init__(self, goal, data):
+        self.goal = goal
+        self._data = data
+        size = goal * goal * goal
+        start = self.HEADER.size
+        view = memoryview(data)
+        self._chances = view[start:start + size * 4].cast('f')
+        self._rolls = view[start + size * 4:start + size * 4 + (size + 7) // 8]
+    def index(self, score, opponent, turn):
+        """returns the position of a state in the table"""
+        return (score * self.goal + opponent) * self.goal + turn
+    def should_roll(self, score, opponent, turn):
+        """returns True when rolling is optimal"""
+        if turn == 0:
+            return True
+        if score + turn >= self.goal:
+            return False
+        index = self.index(score, opponent, turn)
+        return bool(self._rolls[index >> 3] >> (index & 7) & 1)
+    def win_chance(self, score, opponent, turn=0):
+        """returns the chance to win for the player to move"""
+        if score + turn >= self.goal:
+            return 1.0
+        if opponent >= self.goal:
+            return 0.0
+        return self._chances[self.index(score, opponent, turn)]
+    @staticmethod
+    def cache_path(goal=GOAL):
+        """returns the file the table for goal is cached in"""
+        cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(cache, 'terminal-games', 'pig-%d.bin' % goal)
+    @classmethod
+    def load(cls, goal=GOAL, path=None):
+        """Maps the cached table, solves and saves it first when missing"""
+        path = path or cls.cache_path(goal)
+        size = goal * goal * goal
+        length = cls.HEADER.size + size * 4 + (size + 7) // 8
+        try:
+            with open(path, 'rb') as handle:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(data) == length and cls.HEADER.unpack_from(data) == (cls.MAGIC, goal):
+                return cls(goal, data)
+            data.close()
+        except (OSError, ValueError):
+            pass
+
+        chances, rolls = cls.solve(goal)
+        data = cls.HEADER.pack(cls.MAGIC, goal) + chances.tobytes() + bytes(rolls)
+        try:
+            import tempfile  # slow to import, only needed when the table is solved
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'wb') as output:
+                output.write(data)
+            os.replace(temp, path)
+        except OSError:
+            pass
+        return cls(goal, data)
+    @staticmethod
+    def solve(goal=GOAL):
+        """Value iteration over all states, returns the chances and roll bits
+
+        A turn only moves to states with a higher score sum, except for
+        rolling a one which swaps to the opponent at the same scores. So the
+        scores are solved per pair (i, j) and (j, i), highest sum first. The
+        pair is a small fixed point that is found by solving the 2x2 linear
+        system of the current policy until the policy stops changing.
+        """
+        chances = array('f', bytes(4 * goal * goal * goal))
+        rolls = bytearray((goal * goal * goal + 7) // 8)
+
+        def turn(score, opponent, lose):
+            # Chances for every turn total with lose the chance after a one,
+            # each also kept as const + slope * lose to solve the pair
+            top = goal - score
+            values = [1.0] * (top + 6)
+            consts = [1.0] * (top + 6)
+            slopes = [0.0] * (top + 6)
+            policy = [False] * top
+            for total in range(top - 1, 0, -1):
+                hold = 1.0 - chances[(opponent * goal + score + total) * goal]
+                roll = (lose + values[total + 2] + values[total + 3] + values[total + 4]
+                        + values[total + 5] + values[total + 6]) / 6
+                if roll > hold:
+                    values[total] = roll
+                    consts[total] = (consts[total + 2] + consts[total + 3] + consts[total + 4]
+                                     + consts[total + 5] + consts[total + 6]) / 6
+                    slopes[total] = (1 + slopes[total + 2] + slopes[total + 3] + slopes[total + 4]
+                                     + slopes[total + 5] + slopes[total + 6]) / 6
+                    policy[total] = True
+                else:
+                    values[total] = consts[total] = hold
+                    slopes[total] = 0.0
+            values[0] = (lose + sum(values[2:7])) / 6
+            policy[0] = True
+            return values, sum(consts[2:7]) / 6, (1 + sum(slopes[2:7])) / 6, policy
+
+        def store(score, opponent, values, policy):
+            base = (score * goal + opponent) * goal
+            chances[base:base + goal - score] = array('f', values[:goal - score])
+            for total, roll in enumerate(policy):
+                if roll:
+                    rolls[(base + total) >> 3] |= 1 << ((base + total) & 7)
+
+        for total in range(2 * goal - 2, -1, -1):
+            for score in range(max(0, total - goal + 1), total // 2 + 1):
+                opponent = total - score
+                mine = theirs = 0.5
+                previous = None
+                for _ in range(100):
+                    values, const, slope, policy = turn(score, opponent, 1 - theirs)
+                    if score == opponent:
+                        mine = theirs = (const + slope) / (1 + slope)
+                        if policy == previous:
+                            break
+                        previous = policy
+                        continue
+                    other, other_const, other_slope, other_policy = turn(opponent, score, 1 - mine)
+                    if (policy, other_policy) == previous:
+                        break
+                    previous = policy, other_policy
+                    mine = (const + slope - slope * (other_const + other_slope)) / (1 - slope * other_slope)
+                    theirs = other_const + other_slope * (1 - mine)
+                store(score, opponent, values, policy)
+                if score != opponent:
+                    store(opponent, score, other, other_policy)
+        return chances, rolls
+
+
+class AIPlayer(Player):
+    """AI Class for the game, inherits Player class"""
+    def __init__(self, policy=None):
+        super().__init__('Sup_Bot', 42)
+        self._firstroll = 0
+        self._policy = policy
+        self._opponents = []
+    def set_opponents(self, players):
+        """Sets the players the AI plays against"""
+        self._opponents = [player for player in players if player is not self]
+    def _should_roll(self):
+        # With more than two players the leading opponent is the one to beat
+        opponent = max([player.score() for player in self._opponents] or [0])
+        if self._policy is None:
+            self._policy = PigPolicy.load()
+        return self._policy.should_roll(self._score, min(opponent, GOAL - 1), self._tempscore)
+    def will_roll(self):
+        _CONSOLE.pause(2)
+        print('Would you like to start to roll or continue rolling?')
+        print('Please enter "y" for yes or "n" for hold your turn.')
+        if self._firstroll == 0 or self._should_roll():
+            print(">y")
+            print()
+            _CONSOLE.pause(1)
+            self._firstroll = 1
+            self.dice_roll()
+        else:
+            print(">n")
+            print()
+            _CONSOLE.pause(1)
+            print(self._name + " holding their turn....")
+            self._score += self._tempscore
+            self._tempscore = 0
+            self._number_rolls = 0
+            print("Total score: ", self._score)
+            self._firstroll = 0
+    def dice_roll(self):
+        """Presents the amount before you roll your dice and also rolls the dice for the AI"""
+        answer = 0
+        print("************************")
+        print("Total Score: ", self._score)
+        print("Turn Score: ", self._tempscore)
+        print("Times Rolled: ", self._number_rolls)
+        print()
+        _CONSOLE.pause(.5)
+        print("Rolling the dices...")
+        answer = _CONSOLE.roll()
+        print("The values is ", answer)
+        print()
+        self._number_rolls += 1
+        if answer == 1:
+            print("Your score will be emptied, turn ends")
+            print("Total score: ", self._score)
+            _CONSOLE.pause(2)
+            self._firstroll = 0
+            self._tempscore = 0
+            self._number_rolls = 0
+            print()
+        else:
+            self._tempscore += answer
+            self.will_roll()
+class PlayerQueue:
+    """Player Queue for the Rounds"""
+    def __init__(self, player_list):
+        self._players = player_list
+        self._counter = 0
+        self._should_stop = False
+    def __iter__(self):
+        return self
+    def __next__(self):
+        if self._should_stop:
+            raise StopIteration
+        if self._counter >= len(self._players):
+            self._counter = 0
+        player = self._players[self._counter]
+        self._counter = self._counter + 1
+        return (self._counter, player)
+
+# Headless strategies get (score, opponent scores, turn total) and return
+# whether to roll, or the chance to roll for strategies that flip a coin
+def hold_at(limit, score, opponents, turn):
+    """Rolls until the turn total reaches limit"""
+    return turn < limit
+def sup_bot(score, opponents, turn):
+    """The original AI, a coin flip between holding after 3 or after 30"""
+    if turn <= 3:
+        return True
+    return 0.5 if turn <= 30 else False
+_POLICY = None
+def optimal(score, opponents, turn):
+    """The solved policy AIPlayer uses"""
+    global _POLICY
+    if _POLICY is None:
+        _POLICY = PigPolicy.load()
+    return _POLICY.should_roll(score, min(max(opponents), GOAL - 1), turn)
+
+STRATEGIES = {
+    'optimal': optimal,
+    'sup_bot': sup_bot,
+    'hold20': partial(hold_at, 20),
+    'hold25': partial(hold_at, 25),
+}
+
+# Dice come from random bytes, bytes above 251 are dropped so every face
+# has the same chance
+DICE = bytes(value % 6 + 1 for value in range(256))
+DICE_BIAS = bytes(range(252, 256))
+def roll_dice(rng, batch=1 << 16):
+    """Endless dice rolls, generated a batch at a time"""
+    while True:
+        yield from rng.randbytes(batch).translate(DICE, DICE_BIAS)
+
+def play_games(names, games, seed=None, offset=0, rotate=True):
+    """Plays games between the named strategies without any output
+
+    The first seat rotates with the game number unless rotate is False,
+    then the first name always starts. Returns the wins per seat and a
+    Counter with the number of turns the games took.
+    """
+    rng = random.Random(seed)
+    dice = roll_dice(rng)
+    strategies = [STRATEGIES[name] for name in names]
+    players = len(strategies)
+    wins = [0] * players
+    lengths = Counter()
+    for game in range(offset, offset + games):
+        scores = [0] * players
+        player = game % players if rotate else 0
+        turns = 0
+        while True:
+            turns += 1
+            strategy = strategies[player]
+            score = scores[player]
+            opponents = scores[:player] + scores[player + 1:]
+            turn = 0
+            while score + turn < GOAL:
+                if turn:
+                    decision = strategy(score, opponents, turn)
+                    if decision is not True and not (decision and rng.random() < decision):
+                        break
+                roll = next(dice)
+                if roll == 1:
+                    turn = 0
+                    break
+                turn += roll
+            scores[player] = score + turn
+            if scores[player] >= GOAL:
+                break
+            player = (player + 1) % players
+        wins[player] += 1
+        lengths[turns] += 1
+    return wins, lengths
+
+def simulate(names, games, seed=None, workers=1, chunk=10000):
+    """Plays games in chunks, spread over a process pool when workers > 1"""
+    seed = random.randrange(1 << 32) if seed is None else seed
+    jobs = [(names, min(chunk, games - start), seed + start, start) for start in range(0, games, chunk)]
+    wins = [0] * len(names)
+    lengths = Counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor  # slow to import, only needed here
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(play_games, *zip(*jobs)))
+    else:
+        results = [play_games(*job) for job in jobs]
+    for chunk_wins, chunk_lengths in results:
+        wins = [total + won for total, won in zip(wins, chunk_wins)]
+        lengths.update(chunk_lengths)
+    return wins, lengths
+
+def turn_outcomes(strategy, score, opponent, goal=GOAL):
+    """Exact outcome of one turn, returns the chance to roll a one and a
+    list with the chance to end the turn at every turn total. Totals from
+    goal - score up reach the goal."""
+    top = goal - score
+    reach = [0.0] * (top + 6)
+    reach[0] = 1.0
+    ends = [0.0] * (top + 6)
+    bust = 0.0
+    for total in range(top):
+        chance = reach[total]
+        if not chance:
+            continue
+        roll = float(strategy(score, [opponent], total)) if total else 1.0
+        if roll < 1:
+            ends[total] += chance * (1 - roll)
+        if roll:
+            chance *= roll / 6
+            bust += chance
+            for face in range(2, 7):
+                reach[total + face] += chance
+    for total in range(top, top + 6):
+        ends[total] = reach[total]
+    return bust, ends
+
+# Outcomes of a turn per (strategy name, score, opponent score, goal), a
+# turn does not depend on who started so both seat orders share them
+_OUTCOMES = {}
+def cached_outcomes(name, score, opponent, goal=GOAL):
+    """turn_outcomes of a named strategy as the chance to roll a one, the
+    chance to reach the goal and the (gain, chance) of the other ends"""
+    key = (name, score, opponent, goal)
+    outcomes = _OUTCOMES.get(key)
+    if outcomes is None:
+        bust, ends = turn_outcomes(STRATEGIES[name], score, opponent, goal)
+        top = goal - score
+        gains = [(gain, ends[gain]) for gain in range(2, top) if ends[gain]]
+        outcomes = _OUTCOMES[key] = (bust, sum(ends[top:]), gains)
+    return outcomes
+
+def evaluate(names, goal=GOAL):
+    """Exact chance that the first of two strategies wins and the expected
+    number of turns, without sampling
+
+    Like the solver this works per score pair, highest sum first. A turn
+    ends at a higher sum unless it rolls a one, which hands the same
+    scores to the other player, so each pair is a 2x2 linear system.
+    """
+    # chances[p][own][other] and turns[p][own][other] with p to move
+    chances = [[[0.0] * goal for _ in range(goal)] for _ in names]
+    turns = [[[0.0] * goal for _ in range(goal)] for _ in names]
+    for total in range(2 * goal - 2, -1, -1):
+        for first in range(max(0, total - goal + 1), min(total, goal - 1) + 1):
+            second = total - first
+            terms = []
+            for player, own, other in ((0, first, second), (1, second, first)):
+                bust, chance, gains = cached_outcomes(names[player], own, other, goal)
+                after = chances[1 - player][other]
+                later = turns[1 - player][other]
+                length = 1.0
+                for gain, end in gains:
+                    chance += end * (1 - after[own + gain])
+                    length += end * later[own + gain]
+                terms.append((chance, length, bust))
+            (chance1, length1, bust1), (chance2, length2, bust2) = terms
+            # x = chance1 + bust1 * (1 - y) and y = chance2 + bust2 * (1 - x)
+            x = (chance1 + bust1 - bust1 * (chance2 + bust2)) / (1 - bust1 * bust2)
+            chances[0][first][second] = x
+            chances[1][second][first] = chance2 + bust2 * (1 - x)
+            # x = length1 + bust1 * y and y = length2 + bust2 * x
+            x = (length1 + bust1 * length2) / (1 - bust1 * bust2)
+            turns[0][first][second] = x
+            turns[1][second][first] = length2 + bust2 * x
+    return chances[0][0][0], turns[0][0][0]
+
+def wilson(wins, games, z=1.96):
+    """returns the Wilson score interval of a win rate"""
+    if not games:
+        return 0.0, 1.0
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    margin = z * (rate * (1 - rate) / games + z * z / (4 * games * games)) ** 0.5 / (1 + z * z / games)
+    return center - margin, center + margin
+
+class Tournament:
+    """Round-robin between strategies over every player count and seat order
+
+    A matchup is one seat order, the first seat starts like the highest
+    roll_order does in the game. Matchups are played in batches until the
+    Wilson interval of every seat is within precision, or all seats are
+    far away from a fair share. The open matchup with the widest
+    interval gets the next batch, so close matchups get the most games.
+    Results are saved after every batch and loaded again on the next run.
+    """
+    def __init__(self, names, players=(2,), precision=0.01, batch=2000, path=None):
+        self.precision = precision
+        self.batch = batch
+        self.path = path
+        self.results = {}
+        for count in players:
+            for group in itertools.combinations(names, count):
+                for order in itertools.permutations(group):
+                    self.results[','.join(order)] = {'games': 0, 'wins': [0] * count, 'batches': 0}
+        if path and os.path.exists(path):
+            self.load()
+    def load(self):
+        """Continues from the results file"""
+        with open(self.path) as handle:
+            saved = json.load(handle)
+        for key, result in saved.items():
+            if key in self.results and len(result['wins']) == len(self.results[key]['wins']):
+                self.results[key] = result
+    def save(self):
+        """Writes the results file, replacing it at once so it is never half written"""
+        import tempfile  # slow to import, only needed with a results file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        handle, temp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(handle, 'w') as output:
+            json.dump(self.results, output, indent=1)
+        os.replace(temp, self.path)
+    def margin(self, key):
+        """returns the widest half interval of the seats in a matchup"""
+        result = self.results[key]
+        return max(high - low for low, high in
+                   (wilson(wins, result['games']) for wins in result['wins'])) / 2
+    def is_done(self, key):
+        """returns True when a matchup needs no more games"""
+        result = self.results[key]
+        if result['games'] < self.batch:
+            return False
+        if self.margin(key) <= self.precision:
+            return True
+        # Lopsided matchups stop early, the seats are at least a full
+        # interval width away from a fair share
+        fair = 1 / len(result['wins'])
+        intervals = [wilson(wins, result['games']) for wins in result['wins']]
+        return all(low - fair > high - low or fair - high > high - low for low, high in intervals)
+    def run(self, workers=None, budget=None):
+        """Plays batches until every matchup is done or budget games are played"""
+        workers = workers or os.cpu_count() or 1
+        pending = Counter()
+        running = {}
+        submitted = 0
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait  # slow to import
+        with ProcessPoolExecutor(workers) as pool:
+            while True:
+                while len(running) < 2 * workers and (budget is None or submitted < budget):
+                    candidates = [key for key in self.results if not self.is_done(key)]
+                    if not candidates:
+                        break
+                    key = min(candidates, key=lambda key: (pending[key], -self.margin(key)))
+                    result = self.results[key]
+                    seed = (zlib.crc32(key.encode()) << 32) + result['batches']
+                    result['batches'] += 1
+                    future = pool.submit(play_games, key.split(','), self.batch, seed, 0, False)
+                    running[future] = key
+                    pending[key] += 1
+                    submitted += self.batch
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    pending[key] -= 1
+                    wins, _ = future.result()
+                    result = self.results[key]
+                    result['games'] += sum(wins)
+                    result['wins'] = [total + won for total, won in zip(result['wins'], wins)]
+                if self.path:
+                    self.save()
+    def report(self):
+        """Prints the ranking, the seat advantage and every matchup"""
+        scores = {}
+        seats = {}
+        for key, result in self.results.items():
+            if not result['games']:
+                continue
+            names = key.split(',')
+            fair = 1 / len(names)
+            for seat, (name, wins) in enumerate(zip(names, result['wins'])):
+                scores.setdefault(name, []).append(wins / result['games'] - fair)
+                seats.setdefault(len(names), [[] for _ in names])[seat].append(wins / result['games'])
+
+        print("%-8s %8s %10s" % ('Strategy', 'Matchups', 'Vs fair'))
+        for name, above in sorted(scores.items(), key=lambda item: -sum(item[1]) / len(item[1])):
+            print("%-8s %8d %+9.2f%%" % (name, len(above), 100 * sum(above) / len(above)))
+        print()
+        for count, rates in sorted(seats.items()):
+            print("%d players, win rate per seat: %s" % (
+                count, ' '.join('%.2f%%' % (100 * sum(rate) / len(rate)) for rate in rates)))
+        print()
+        for key, result in sorted(self.results.items(), key=lambda item: (len(item[1]['wins']), item[0])):
+            games = result['games']
+            rates = ' '.join('%6.2f%%' % (100 * wins / games) for wins in result['wins']) if games else '-'
+            print("%-36s %9d %s +- %.2f%%" % (key, games, rates, 100 * self.margin(key)))
+
+def report(names, wins, lengths, duration):
+    """Prints win rates and the distribution of game lengths"""
+    games = sum(wins)
+    print("%d games in %.1fs (%d games/s)" % (games, duration, games / max(duration, 1e-9)))
+    print()
+    for seat, (name, won) in enumerate(zip(names, wins)):
+        rate = won / games
+        margin = 1.96 * (rate * (1 - rate) / games) ** 0.5
+        print("%d. %-8s %6.2f%% +- %.2f%%" % (seat + 1, name, 100 * rate, 100 * margin))
+
+    turns = sorted(lengths.elements())
+    print()
+    print("Turns per game: mean %.1f, median %d, p90 %d, max %d" % (
+        sum(turns) / games, turns[games // 2], turns[games * 9 // 10], turns[-1]))
+    low, high = turns[0], turns[games * 99 // 100]
+    step = max(1, (high - low + 1) // 15)
+    bins = [(start, sum(lengths[length] for length in range(start, start + step)))
+            for start in range(low, high + 1, step)]
+    largest = max(count for start, count in bins)
+    for start, count in bins:
+        print("%4d-%-4d %8d %s" % (start, start + step - 1, count, '#' * round(50 * count / largest)))
+
+def main():
+    """main function for game"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--solve', action='store_true', help='solve and cache the AI policy, then exit')
+    parser.add_argument('--simulate', type=int, metavar='GAMES', help='play GAMES headless games and report the results')
+    parser.add_argument('--check', action='store_true', help='compare --simulate with the exact evaluation')
+    parser.add_argument('--evaluate', action='store_true', help='exact win chances and game length of two strategies')
+    parser.add_argument('--tournament', action='store_true', help='rank the strategies in an adaptive round-robin')
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES),
+                        help='strategies to play, 2-4 for --simulate and 2 for --evaluate '
+                             '(default: optimal sup_bot, or all for --tournament)')
+    parser.add_argument('--players', nargs='+', type=int, choices=[2, 3, 4], default=[2],
+                        help='player counts in the tournament (default: 2)')
+    parser.add_argument('--precision', type=float, default=0.01,
+                        help='stop a matchup when the 95%% interval is within this (default: 0.01)')
+    parser.add_argument('--budget', type=int, help='total number of tournament games')
+    parser.add_argument('--results', help='results file to resume the tournament from')
+    parser.add_argument('--seed', type=int, help='seed for the simulation or the game')
+    parser.add_argument('--workers', type=int,
+                        help='processes to play with (default: 1, or all cores for --tournament)')
+    parser.add_argument('--record', metavar='FILE', help='write a replay of the game to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='play back a replay')
+    parser.add_argument('--fast', action='store_true',
+                        help='play back the replay at full speed without output and check the final state')
+    args = parser.parse_args()
+    if args.simulate:
+        strategies = args.strategies or ['optimal', 'sup_bot']
+        if not 2 <= len(strategies) <= 4:
+            parser.error('--strategies takes 2-4 strategies')
+        if 'optimal' in strategies:
+            PigPolicy.load()
+        start = time.perf_counter()
+        wins, lengths = simulate(strategies, args.simulate, args.seed, args.workers or 1)
+        report(strategies, wins, lengths, time.perf_counter() - start)
+        if args.check:
+            if len(strategies) != 2:
+                parser.error('--check takes 2 strategies')
+            # The simulation rotates the first seat
+            first, first_turns = evaluate(strategies)
+            second, second_turns = evaluate(strategies[::-1])
+            exact = (first + 1 - second) / 2
+            rate = wins[0] / sum(wins)
+            error = (exact * (1 - exact) / sum(wins)) ** 0.5
+            print()
+            print("Exact %s win rate %.4f%%, simulated %.4f%% (%+.2f standard errors)" % (
+                strategies[0], 100 * exact, 100 * rate, (rate - exact) / error))
+            print("Exact mean turns %.3f, simulated %.3f" % (
+                (first_turns + second_turns) / 2, sum(turns * count for turns, count in lengths.items()) / sum(wins)))
+        return
+    if args.evaluate:
+        strategies = args.strategies or ['optimal', 'sup_bot']
+        if len(strategies) != 2:
+            parser.error('--evaluate takes 2 strategies')
+        if 'optimal' in strategies:
+            PigPolicy.load()
+        start = time.perf_counter()
+        for names in (strategies, strategies[::-1]):
+            chance, turns = evaluate(names)
+            print("%s first: %s wins %.6f%%, %s wins %.6f%%, %.3f turns on average" % (
+                names[0], names[0], 100 * chance, names[1], 100 * (1 - chance), turns))
+        print("Evaluated in %.2fs" % (time.perf_counter() - start))
+        return
+    if args.tournament:
+        strategies = args.strategies or sorted(STRATEGIES)
+        if 'optimal' in strategies:
+            PigPolicy.load()
+        tournament = Tournament(strategies, args.players, args.precision, path=args.results)
+        start = time.perf_counter()
+        try:
+            tournament.run(args.workers, args.budget)
+        except KeyboardInterrupt:
+            print("Interrupted" + (", results are saved in " + args.results if args.results else ""))
+        print("Played in %.1fs" % (time.perf_counter() - start))
+        print()
+        tournament.report()
+        return
+    if args.solve:
+        start = time.perf_counter()
+        policy = PigPolicy.load()
+        print("Policy loaded in %.3fs from %s" % (time.perf_counter() - start, PigPolicy.cache_path()))
+        print("First player wins %.4f of optimal games" % policy.win_chance(0, 0))
+        return
+    global _CONSOLE
+    if args.replay:
+        try:
+            replay = Replay.load(args.replay, 'pig')
+        except (OSError, ReplayError) as error:
+            sys.exit(error)
+        _CONSOLE = Console(replay.seed, replay=replay, fast=args.fast)
+        start = time.perf_counter()
+        try:
+            if args.fast:
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    play()
+            else:
+                play()
+        except EOFError:
+            pass
+        replay.finish(_CONSOLE.digest(), time.perf_counter() - start if args.fast else None)
+        return
+    recorder = None
+    seed = args.seed
+    if args.record:
+        seed = new_seed() if seed is None else seed
+        recorder = Recorder(args.record, 'pig', seed)
+    _CONSOLE = Console(seed, recorder)
+    play()
+    # An interrupted game is left without an end, the dice of the turn that
+    # was interrupted are not in the replay
+    if recorder:
+        recorder.end(_CONSOLE.steps, _CONSOLE.digest())
+
+def play():
+    """Plays the interactive game"""
+    print('Please enter a number between 2-4 for players/AI you would like to play.')
+    playernum = int(_CONSOLE.ask())
+    if not 2 <= playernum <= 4:
+        print("Did not select the amount that is to play... now exiting")
+        sys.exit(1)
+
+    start_num = 1
+    player_list = _CONSOLE.players
+    policy = None
+    print('It is time to decide whether the amount playing is a player or AI.')
+    while playernum >= start_num:
+        print('Please enter a "p" for player or anything else for AI')
+        is_player = (_CONSOLE.ask() == 'p')
+        if is_player:
+            print("Please enter the name for the player")
+            player_name = _CONSOLE.ask()
+            player_list.append(Player(player_name))
+            start_num += 1
+        else:
+            print("You have chosen AI computing.")
+            policy = policy or PigPolicy.load()
+            player_list.append(AIPlayer(policy))
+            _CONSOLE.pause(1)
+            start_num += 1
+    print()
+    print("Rolling for order.")
+    for player in player_list:
+        player.roll_order(_CONSOLE.roll())
+    player_list.sort(reverse=True, key=lambda x: x._roll_order)
+    for player in player_list:
+        if isinstance(player, AIPlayer):
+            player.set_opponents(player_list)
+    print("First up:", player_list[0].__str__())
+    player_queue = PlayerQueue(player_list)
+    is_game_over = False
+    while not is_game_over:
+        for index, player in player_queue:
+            print("---------------------------------------------------------------------")
+            print("It is " + player.__str__() + "'s turn!")
+            print()
+            player.will_roll()
+            if player.score() >= GOAL:
+                print()
+                print("The player " + player.__str__() + " has won!")
+                is_game_over = True
+                break
+
+if __name__ == '__main__':
+    main()
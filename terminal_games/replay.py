@@ -0,0 +1,201 @@
+# Replays of the terminal games
+#
+# A replay is the seed of a game plus every input with the step of the
+# game it was made in and the time it was made at. It is written while
+# playing, every input is flushed right away so a game that crashed can
+# still be played back. One format for all games:
+#
+#   header   b'TGRP', version, game name, settings JSON, 64 bit seed
+#   records  kind, step delta, milliseconds delta, payload
+#
+# Numbers are varints and steps and times are deltas, so an input takes
+# about 4 bytes. The last record is END with a digest of the final game
+# state, a playback checks that it ends in the same state.
+
+import os
+import sys
+import json
+import time
+import struct
+
+MAGIC = b'TGRP'
+VERSION = 1
+
+INPUT = 1
+END = 2
+
+
+class ReplayError(Exception):
+	pass
+
+
+def write_varint(out, value):
+	while value > 0x7f:
+		out.append(value & 0x7f | 0x80)
+		value >>= 7
+	out.append(value)
+
+
+def write_bytes(out, data):
+	write_varint(out, len(data))
+	out += data
+
+
+# Readers raise IndexError when the data ends early
+def read_varint(data, position):
+	value = shift = 0
+	while True:
+		byte = data[position]
+		position += 1
+		value |= (byte & 0x7f) << shift
+		if byte < 0x80:
+			return value, position
+		shift += 7
+
+
+def read_bytes(data, position):
+	length, position = read_varint(data, position)
+	if position + length > len(data):
+		raise IndexError('data ends early')
+	return data[position:position + length], position + length
+
+
+def new_seed():
+	return int.from_bytes(os.urandom(8), 'little') >> 1
+
+
+def digest(*values):
+	# repr of numbers, strings, lists and tuples is stable between runs.
+	# Imported here, hashlib is slow to import and only needed with replays
+	import hashlib
+	return hashlib.blake2b(repr(values).encode(), digest_size=16).digest()
+
+
+class Recorder:
+	def __init__(self, path, game, seed, settings=None):
+		self.file = open(path, 'wb')
+		self.start = time.monotonic()
+		self.step = 0
+		self.milliseconds = 0
+
+		header = bytearray(MAGIC)
+		header.append(VERSION)
+		write_bytes(header, game.encode())
+		write_bytes(header, json.dumps(settings or {}, sort_keys=True).encode())
+		header += struct.pack('<Q', seed)
+		self.write(header)
+
+	def write(self, data):
+		self.file.write(data)
+		self.file.flush()
+
+	def record(self, kind, step, payload):
+		milliseconds = int((time.monotonic() - self.start) * 1000)
+		record = bytearray((kind,))
+		write_varint(record, step - self.step)
+		write_varint(record, milliseconds - self.milliseconds)
+		write_bytes(record, payload)
+		self.step = step
+		self.milliseconds = milliseconds
+		self.write(record)
+
+	def input(self, step, data):
+		self.record(INPUT, step, data.encode() if isinstance(data, str) else data)
+
+	# Closes the replay with the digest of the final state
+	def end(self, step, state_digest):
+		if not self.file.closed:
+			self.record(END, step, state_digest)
+			self.file.close()
+
+
+class Replay:
+	def __init__(self, game, seed, settings, inputs, end=None):
+		self.game = game
+		self.seed = seed
+		self.settings = settings
+		# (step, milliseconds, data) of every input, steps and times from the start
+		self.inputs = inputs
+		# (step, milliseconds, digest) or None when the game did not end cleanly
+		self.end = end
+		self.start = None
+
+	@classmethod
+	def load(cls, path, game=None):
+		with open(path, 'rb') as handle:
+			data = handle.read()
+		if data[:4] != MAGIC:
+			raise ReplayError('{} is not a replay'.format(path))
+		if data[4:5] != bytes((VERSION,)):
+			raise ReplayError('{} has replay version {}, expected {}'.format(path, data[4], VERSION))
+
+		try:
+			name, position = read_bytes(data, 5)
+			settings, position = read_bytes(data, position)
+			seed, = struct.unpack_from('<Q', data, position)
+		except (IndexError, struct.error):
+			raise ReplayError('{} ends in its header'.format(path))
+		name = name.decode()
+		if game and name != game:
+			raise ReplayError('{} is a replay of {}, not of {}'.format(path, name, game))
+
+		inputs = []
+		end = None
+		step = milliseconds = 0
+		position += 8
+		while position < len(data) and end is None:
+			try:
+				kind = data[position]
+				step_delta, next_position = read_varint(data, position + 1)
+				time_delta, next_position = read_varint(data, next_position)
+				payload, next_position = read_bytes(data, next_position)
+			except IndexError:
+				# Cut off in the middle of a record, keep what came before
+				break
+			position = next_position
+			step += step_delta
+			milliseconds += time_delta
+			if kind == INPUT:
+				inputs.append((step, milliseconds, payload))
+			elif kind == END:
+				end = (step, milliseconds, payload)
+			else:
+				raise ReplayError('{} has an unknown record {} at byte {}'.format(path, kind, position))
+
+		return cls(name, seed, json.loads(settings.decode()), inputs, end)
+
+	# Step the game has to play to, the end or the last input
+	@property
+	def last_step(self):
+		if self.end:
+			return self.end[0]
+		return self.inputs[-1][0] if self.inputs else 0
+
+	# Seconds until the input at milliseconds is due when playing in real time,
+	# the clock starts at the first call
+	def remaining(self, milliseconds):
+		if self.start is None:
+			self.start = time.monotonic() - milliseconds / 1000
+		return self.start + milliseconds / 1000 - time.monotonic()
+
+	def wait(self, milliseconds):
+		remaining = self.remaining(milliseconds)
+		if remaining > 0:
+			time.sleep(remaining)
+
+	# Prints how the playback ended, the exit code is 1 when the final state
+	# is not the recorded one
+	def finish(self, state_digest, elapsed=None):
+		message = 'Played back {} inputs over {} steps of {}'.format(len(self.inputs), self.last_step, self.game)
+		if elapsed is not None:
+			last = self.end or (self.inputs[-1] if self.inputs else (0, 0, b''))
+			message += ' in {:.3f}s, the game took {:.1f}s'.format(elapsed, last[1] / 1000)
+		print(message)
+
+		if self.end is None:
+			print('The replay has no final state, it was cut off')
+		elif self.end[2] == state_digest:
+			print('The final state matches the recording')
+		else:
+			print('The final state differs from the recording')
+			sys.exit(1)
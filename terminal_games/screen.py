@@ -0,0 +1,97 @@
+# What Snake and Color Wars share around their game engine: the colors,
+# half blocks, spectators, recording and playing back replays.
+#
+# A game subclasses ScreenGame. It has COLOR_PAIRS and HALF_BLOCK_COLORS,
+# create() to make an engine from the settings of a replay, start() that
+# draws the first frame, loop(), replay_finished(), a step counter for
+# replays and digest(). Its main() adds the options with add_arguments()
+# and hands over to run().
+
+import sys
+import curses
+
+from .framebuffer import half_block_pairs
+from .replay import Recorder, Replay, ReplayError, new_seed
+
+
+class ScreenGame:
+	COLOR_PAIRS = {}
+	# Colors of the cells with half blocks, the first is the background
+	HALF_BLOCK_COLORS = ()
+
+	@classmethod
+	def color_pairs(cls, half_blocks=False):
+		pairs = dict(cls.COLOR_PAIRS)
+		if half_blocks:
+			pairs.update(half_block_pairs(cls.HALF_BLOCK_COLORS))
+		return pairs
+
+	def __call__(self, window):
+		self.window = window
+		if self.half_blocks and curses.COLOR_PAIRS <= max(self.color_pairs(True)):
+			# Not enough color pairs in this terminal
+			self.half_blocks = False
+		for pair, (fg, bg) in self.color_pairs(self.half_blocks).items():
+			curses.init_pair(pair, fg, bg)
+
+		self.start()
+		self.loop()
+		# The loop only ends at the end of a replay
+		self.replay_finished()
+
+
+def add_arguments(parser):
+	parser.add_argument('--half-blocks', action='store_true', help='draw two rows of cells per line with half blocks')
+	parser.add_argument('--spectate', metavar='PATH', help='let others watch the game on a Unix socket')
+	parser.add_argument('--watch', metavar='PATH', help='watch a game that is played with --spectate PATH')
+	parser.add_argument('--record', metavar='FILE', help='write a replay of the game to FILE')
+	parser.add_argument('--replay', metavar='FILE', help='play back a replay')
+	parser.add_argument('--fast', action='store_true', help='play back the replay at full speed without a screen and check the final state')
+
+
+# Plays a game of game_class on the screen, or watches or plays back one.
+# settings are written to a recording, fast_forward plays a replay without
+# a screen.
+def run(args, name, game_class, settings, fast_forward):
+	spectators = None
+	if args.watch or args.spectate:
+		# Sockets are only needed for spectators, keep them out of startup
+		from . import spectate
+		if args.watch:
+			spectate.watch(args.watch)
+			return
+		spectators = spectate.Broadcaster(args.spectate, game_class.color_pairs(args.half_blocks))
+
+	if args.replay:
+		try:
+			replay = Replay.load(args.replay, name)
+		except (OSError, ReplayError) as error:
+			sys.exit(error)
+		if args.fast:
+			fast_forward(replay)
+			return
+
+		game = game_class.create(replay.settings, replay.seed, args.half_blocks, replay=replay)
+		game.spectators = spectators
+		try:
+			curses.wrapper(game)
+		except KeyboardInterrupt:
+			sys.exit(0)
+		replay.finish(game.digest())
+		return
+
+	recorder = None
+	seed = args.seed
+	if args.record:
+		seed = new_seed() if seed is None else seed
+		recorder = Recorder(args.record, name, seed, settings)
+
+	game = game_class.create(settings, seed, args.half_blocks, recorder)
+	game.spectators = spectators
+	try:
+		curses.wrapper(game)
+	except KeyboardInterrupt:
+		sys.exit(0)
+	finally:
+		if recorder:
+			recorder.end(game.step, game.digest())
@@ -0,0 +1,812 @@
+#!/usr/bin/env python3
+# Snake game for the terminal
+# Copyright (C) 2017 Maikel Martens
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import curses
+import time
+import random
+import select
+import argparse
+import heapq
+from collections import deque
+
+from .framebuffer import FrameBuffer, half_blocks
+from .replay import digest
+from .screen import ScreenGame, add_arguments, run
+from .tracing import span, traced
+
+
+class SnakeEnv:
+	# Snake game logic without a screen. Cells are numbered row * width + col
+	# on the field including its wall, the playing field is 1..field_size.
+
+	UP = 1
+	LEFT = 2
+	DOWN = 3
+	RIGHT = 4
+
+	OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+	def __init__(self, field_size=25):
+		self.field_size = field_size
+		self.width = field_size + 2
+		self.steps = {self.UP: -self.width, self.DOWN: self.width, self.LEFT: -1, self.RIGHT: 1}
+		self.random = random.Random()
+
+		self.body = deque()
+		self.apple = None
+		self.direction = None
+		self.done = False
+
+		# Cells of the board with the border, body and wall cells are set
+		self.occupied = None
+		# Free cells to place apples, with the position of each cell in the list
+		self.free_cells = None
+		self.free_position = None
+		self.empty = None
+
+	# Start a new game, returns the state
+	def reset(self, seed=None):
+		if seed is not None:
+			self.random.seed(seed)
+
+		self.direction = self.UP
+		self.done = False
+		self.body = deque()
+		self.clear_field()
+
+		for row in range(int(self.field_size / 2), int(self.field_size / 2 - 4), -1):
+			self.body.append(self.cell(row, int(self.field_size / 2)))
+			self.occupy(self.body[-1])
+
+		self.apple = self.cell(int(self.field_size / 3), int(self.field_size / 3))
+		return self.state()
+
+	def clear_field(self):
+		if self.empty is None:
+			self.occupied = bytearray(self.width * self.width)
+			self.free_cells = []
+			self.free_position = [-1] * len(self.occupied)
+
+			for row in range(self.width):
+				for col in range(self.width):
+					if 0 < row <= self.field_size and 0 < col <= self.field_size:
+						self.vacate(self.cell(row, col))
+					else:
+						self.occupied[self.cell(row, col)] = 1
+			self.empty = (self.occupied, self.free_cells, self.free_position)
+
+		# Copy the empty field, that is much cheaper than building it again
+		self.occupied = bytearray(self.empty[0])
+		self.free_cells = list(self.empty[1])
+		self.free_position = list(self.empty[2])
+
+	# Move one cell, action is a new direction or None to keep going. Turning
+	# back is ignored. Returns the state, the reward (1 for an apple, -1 for
+	# dying) and whether the game is over.
+	def step(self, action=None):
+		if action and action != self.OPPOSITE[self.direction]:
+			self.direction = action
+
+		head = self.body[-1] + self.steps[self.direction]
+		ate_apple = head == self.apple
+		if not ate_apple:
+			self.vacate(self.body.popleft())
+
+		# Check if hit wall or own body
+		if self.occupied[head]:
+			self.done = True
+			return self.state(), -1, True
+
+		self.body.append(head)
+		self.occupy(head)
+		if ate_apple:
+			self.place_apple()
+			return self.state(), 1, False
+		return self.state(), 0, False
+
+	def state(self):
+		return self.body[-1], self.apple, self.direction, len(self.body)
+
+	def cell(self, row, col):
+		return row * self.width + col
+
+	def occupy(self, cell):
+		self.occupied[cell] = 1
+
+		# Swap the last free cell into the place of this one
+		position = self.free_position[cell]
+		last = self.free_cells.pop()
+		if last != cell:
+			self.free_cells[position] = last
+			self.free_position[last] = position
+		self.free_position[cell] = -1
+
+	def vacate(self, cell):
+		self.occupied[cell] = 0
+		self.free_position[cell] = len(self.free_cells)
+		self.free_cells.append(cell)
+
+	def place_apple(self):
+		if not self.free_cells:
+			# The snake fills the whole board
+			self.apple = None
+			return
+
+		self.apple = self.random.choice(self.free_cells)
+
+
+class SnakeBatch:
+	# Many independent games stepped together, a game that ends is started
+	# again right away with the next seed
+
+	def __init__(self, count, field_size=25):
+		self.envs = [SnakeEnv(field_size) for index in range(count)]
+		self.next_seed = 0
+
+	def reset(self, seed=0):
+		self.next_seed = seed + len(self.envs)
+		return [env.reset(seed + index) for index, env in enumerate(self.envs)]
+
+	# One action per game, returns lists of states, rewards and dones
+	def step(self, actions):
+		states = []
+		rewards = []
+		dones = []
+		for env, action in zip(self.envs, actions):
+			state, reward, done = env.step(action)
+			if done:
+				state = env.reset(self.next_seed)
+				self.next_seed += 1
+			states.append(state)
+			rewards.append(reward)
+			dones.append(done)
+		return states, rewards, dones
+
+
+class Autopilot:
+	# Plays SnakeEnv on its own. The path to the apple is planned once and
+	# followed until the apple moves or the path gets blocked.
+
+	STRATEGIES = ('astar', 'bfs', 'hamilton')
+
+	def __init__(self, env, strategy='astar'):
+		self.env = env
+		self.strategy = strategy
+		self.path = deque()
+		self.path_apple = None
+		self.cycle = None
+		# Cell of the cycle that turns into the corner left out of it, and the corner
+		self.detour = None
+
+		# Number of plans and the (averaged, max) time a tick spent planning
+		self.plans = 0
+		self.plan_time = 0
+		self.max_plan_time = 0
+
+	def next_action(self):
+		start = time.perf_counter()
+		env = self.env
+		head = env.body[-1]
+
+		if not self.path or self.path_apple != env.apple or not self.can_move(head, self.path[0]):
+			self.plan()
+
+		if self.path:
+			cell = self.path.popleft()
+		else:
+			cell = self.escape()
+
+		elapsed = time.perf_counter() - start
+		self.plan_time = self.plan_time * 0.95 + elapsed * 0.05
+		self.max_plan_time = max(self.max_plan_time, elapsed)
+
+		if cell is None:
+			return None
+		return self.direction(head, cell)
+
+	@traced('plan')
+	def plan(self):
+		env = self.env
+		self.plans += 1
+		self.path = deque()
+		self.path_apple = env.apple
+		if env.apple is None:
+			return
+
+		cycle = self.hamilton_cycle() if self.strategy == 'hamilton' else None
+		if cycle:
+			# Follow the cycle up to the apple, it never crosses the body once
+			# the body lies on it
+			cell = cycle[env.body[-1]]
+			if not self.can_move(env.body[-1], cell):
+				return
+			for step in range(len(cycle)):
+				self.path.append(cell)
+				if cell == env.apple:
+					return
+				cell = self.cycle_next(cell)
+			# An apple in the corner that can't be reached yet, go round
+			self.path = deque()
+			return
+
+		path = self.find_path(env.body[-1], env.apple, env.occupied, env.body[0])
+		if path and self.tail_reachable(path):
+			self.path = deque(path)
+
+	# Step to take when there is no safe path to the apple
+	def escape(self):
+		env = self.env
+		head = env.body[-1]
+
+		cycle = self.hamilton_cycle()
+		if cycle and self.can_move(head, cycle[head]):
+			return cycle[head]
+
+		# Chase the tail, that keeps the most room to move
+		path = self.find_path(head, env.body[0], env.occupied, env.body[0])
+		if path:
+			return path[0]
+
+		for step in env.steps.values():
+			if self.can_move(head, head + step):
+				return head + step
+		return None
+
+	def can_move(self, head, cell):
+		env = self.env
+		if cell - head not in env.steps.values():
+			return False
+		# The tail moves away, unless the apple is eaten
+		return not env.occupied[cell] or (cell == env.body[0] and cell != env.apple)
+
+	# Shortest path from start to goal over the free cells, without start.
+	# The tail counts as free because it moves away.
+	def find_path(self, start, goal, occupied, tail):
+		width = self.env.width
+		steps = list(self.env.steps.values())
+		came_from = {start: None}
+
+		if self.strategy == 'astar':
+			goal_row, goal_col = divmod(goal, width)
+			queue = [(0, 0, start)]
+			cost = {start: 0}
+			while queue:
+				priority, distance, cell = heapq.heappop(queue)
+				if cell == goal:
+					break
+				if distance > cost[cell]:
+					continue
+				for step in steps:
+					neighbor = cell + step
+					if (occupied[neighbor] and neighbor != tail) or cost.get(neighbor, distance + 2) <= distance + 1:
+						continue
+					cost[neighbor] = distance + 1
+					came_from[neighbor] = cell
+					row, col = divmod(neighbor, width)
+					heapq.heappush(queue, (distance + 1 + abs(row - goal_row) + abs(col - goal_col), distance + 1, neighbor))
+		else:
+			queue = deque([start])
+			while queue:
+				cell = queue.popleft()
+				if cell == goal:
+					break
+				for step in steps:
+					neighbor = cell + step
+					if neighbor not in came_from and (not occupied[neighbor] or neighbor == tail):
+						came_from[neighbor] = cell
+						queue.append(neighbor)
+
+		if goal not in came_from:
+			return None
+
+		path = []
+		cell = goal
+		while cell != start:
+			path.append(cell)
+			cell = came_from[cell]
+		path.reverse()
+		return path
+
+	# Move a copy of the snake along the path and check it can still reach
+	# its tail, otherwise eating the apple could trap it
+	def tail_reachable(self, path):
+		env = self.env
+		body = deque(env.body)
+		occupied = bytearray(env.occupied)
+
+		for cell in path:
+			if cell != env.apple:
+				occupied[body.popleft()] = 0
+			body.append(cell)
+			occupied[cell] = 1
+
+		return self.find_path(body[-1], body[0], occupied, body[0]) is not None
+
+	# Next cell for every cell on a cycle over the field. A cycle over a grid
+	# has an even number of cells, on an odd field the bottom left corner is
+	# left out and the snake only goes there for an apple.
+	def hamilton_cycle(self):
+		size = self.env.field_size
+		if self.cycle is None:
+			cell = self.env.cell
+			# Along the top row, then back and forth over the rows below it
+			# without the first column
+			order = [cell(1, col) for col in range(1, size + 1)]
+			rows = size if size % 2 == 0 else size - 2
+			for row in range(2, rows + 1):
+				colls = range(size, 1, -1) if row % 2 == 0 else range(2, size + 1)
+				order.extend(cell(row, col) for col in colls)
+			if size % 2:
+				# Up and down over the last two rows
+				for col in range(size, 1, -1):
+					column = (size - 1, size) if (size - col) % 2 == 0 else (size, size - 1)
+					order.extend(cell(row, col) for row in column)
+				rows = size - 1
+			# And up the first column
+			order.extend(cell(row, 1) for row in range(rows, 1, -1))
+
+			self.cycle = {}
+			for index, current in enumerate(order):
+				self.cycle[current] = order[(index + 1) % len(order)]
+			if size % 2:
+				# The corner is a detour from the bottom row to the first
+				# column, it skips the one cell of the cycle between them
+				self.detour = (cell(size, 2), cell(size, 1))
+				self.cycle[cell(size, 1)] = cell(size - 1, 1)
+		return self.cycle
+
+	# The next cell on the cycle, or the corner left out of it when the apple
+	# is there and the cell that is skipped for it is free
+	def cycle_next(self, cell):
+		env = self.env
+		if self.detour and (cell, env.apple) == self.detour:
+			skipped = self.cycle[cell]
+			if not env.occupied[skipped] or len(env.free_cells) == 1:
+				return env.apple
+		return self.cycle[cell]
+
+	def direction(self, head, cell):
+		for direction, step in self.env.steps.items():
+			if head + step == cell:
+				return direction
+
+
+class Snake(ScreenGame):
+	FPS = 12
+	SPEEDS = [6, 8, 10, 12, 16, 20, 25, 30]
+	FIELD_SIZE = 25
+
+	# Direction changes that can be queued ahead of the ticks
+	MAX_QUEUED_DIRECTIONS = 3
+	
+	UP = SnakeEnv.UP
+	LEFT = SnakeEnv.LEFT
+	DOWN = SnakeEnv.DOWN
+	RIGHT = SnakeEnv.RIGHT
+
+	COLOR_PAIRS = {
+		1: (curses.COLOR_RED, 0),
+		2: (curses.COLOR_WHITE, curses.COLOR_YELLOW),
+		3: (curses.COLOR_WHITE, curses.COLOR_CYAN),
+		4: (curses.COLOR_WHITE, curses.COLOR_WHITE),
+	}
+
+	# Colors of the cells with half blocks: field, wall, snake and apple
+	HALF_BLOCK_COLORS = (curses.COLOR_BLACK, curses.COLOR_WHITE, curses.COLOR_CYAN, curses.COLOR_YELLOW)
+	WALL = 1
+	BODY = 2
+	APPLE = 3
+
+	# Directions as they are written in replays
+	REPLAY_KEYS = {UP: 'U', LEFT: 'L', DOWN: 'D', RIGHT: 'R'}
+	REPLAY_DIRECTIONS = {'U': UP, 'L': LEFT, 'D': DOWN, 'R': RIGHT}
+
+	def __init__(self, autopilot=None, seed=None, recorder=None, replay=None, half_blocks=False):
+		self.window = None
+		self.bar = None
+		self.board = None
+		self.frame_count = 0
+		self.current_fps = 0
+		self.start_fps_frame = 0
+		self.start_fps_time = 0
+		self.fps = self.FPS
+
+		# Averaged time of game logic and rendering, and of a key press until
+		# the snake moves in its direction
+		self.frame_time = 0
+		self.input_latency = 0
+
+		# Queued (direction, time of key press)
+		self.directions = deque()
+
+		# Game State
+		self.lives = 3
+		self.points = 0
+		self.env = SnakeEnv(self.FIELD_SIZE)
+		self.env.reset(seed)
+		self.autopilot = Autopilot(self.env, autopilot) if autopilot else None
+
+		# Inputs are written to the recorder, or come from the replay by tick
+		self.recorder = recorder
+		self.replay = replay
+		self.playback = None
+		# Broadcaster that publishes the board to spectators
+		self.spectators = None
+
+		# Draw two rows of cells per line with half blocks, the cells of the
+		# field with the walls are kept in a grid for that
+		self.half_blocks = half_blocks
+		self.blocks = None
+		self.walls = None
+		if replay:
+			self.playback = {}
+			for tick, milliseconds, key in replay.inputs:
+				self.playback.setdefault(tick, []).append(key.decode())
+
+	@classmethod
+	def create(cls, settings, seed, half_blocks, recorder=None, replay=None):
+		# A replay steers by itself
+		return cls(None if replay else settings['autopilot'], seed, recorder, replay, half_blocks)
+
+	def start(self):
+		if self.half_blocks:
+			board_rows, board_colls = (self.FIELD_SIZE + 3) // 2, self.FIELD_SIZE + 3
+		else:
+			board_rows, board_colls = self.FIELD_SIZE + 2, self.FIELD_SIZE * 2 + 6
+
+		self.wbar = curses.newwin(1, self.FIELD_SIZE * 2 + 5, 0, 0)
+		self.wboard = curses.newwin(board_rows, board_colls, 1, 0)
+		self.winfo = curses.newwin(2, self.FIELD_SIZE * 2, board_rows + 2, 0)
+
+		# Frames are drawn in buffers that only write what changed
+		self.bar = FrameBuffer(self.wbar, 1, self.FIELD_SIZE * 2 + 5)
+		self.board = FrameBuffer(self.wboard, board_rows, board_colls)
+
+		self.window.clear()
+		self.window.refresh()
+
+		# Help text
+		self.winfo.addstr(0, 0, "UP = K; DOWN = J; LEFT = H; RIGHT = L")
+		self.winfo.addstr(1, 0, "SPEED = +/-; QUIT = Q")
+
+		self.winfo.refresh()
+
+		# Hide virtual screen cursor
+		curses.curs_set(0)
+		self.window.nodelay(True)
+
+		self.reset(True)
+
+	def replay_finished(self):
+		self.bar.clear()
+		self.bar.put(0, 0, 'Replay finished, press a key')
+		self.bar.present()
+		curses.doupdate()
+		self.window.nodelay(False)
+		self.window.getkey()
+
+	def reset(self, full=False):
+		self.lives -= 1
+
+		if self.lives < 1 or full:
+			if full:
+				self.lives = 3
+
+			# Without a window a replay is fast-forwarded
+			if self.window:
+				self.render_bar() # remove last heart
+				self.wboard.clear()
+
+				if not full:
+					self.wboard.addstr(1,2, "Your final score is {}.".format(self.points))
+				self.wboard.addstr(3,2, "Press a key to start!")
+				self.wboard.refresh()
+				self.wait_key()
+				self.board.invalidate()
+
+			self.lives = 3
+			self.points = 0 
+
+		self.directions.clear()
+		self.env.reset()
+
+	def wait_key(self):
+		if self.playback is not None:
+			# A replay goes on by itself
+			curses.napms(1000)
+			return
+		self.window.nodelay(False)
+		self.window.getkey()
+		self.window.nodelay(True)
+
+	def loop(self):
+		next_tick = time.monotonic()
+		while self.playback is None or self.frame_count < self.replay.last_step:
+			# Fixed game ticks, keys are read while waiting for the next one
+			next_tick += 1.0 / self.fps
+			with span('input'):
+				self.read_keys(next_tick)
+
+			now = time.monotonic()
+			if now - next_tick > 1.0 / self.fps:
+				# Too far behind (or waited for a key on reset), don't catch up
+				next_tick = now
+
+			with span('logic'):
+				done = self.tick(now)
+
+			if done:
+				self.reset()
+				# Don't count waiting for a new game as frame time
+				now = time.monotonic()
+
+			self.render_bar()
+			self.render_board()
+			curses.doupdate()
+
+			self.frame_time = self.frame_time * 0.8 + (time.monotonic() - now) * 0.2
+
+	# One game tick with one direction change, when playing back a replay the
+	# change comes from the replay
+	def tick(self, now=None):
+		self.frame_count += 1
+		action = None
+		if self.playback is not None:
+			self.directions.clear()
+			for key in self.playback.pop(self.frame_count, ()):
+				if key in '+-':
+					self.set_speed(1 if key == '+' else -1)
+				else:
+					action = self.REPLAY_DIRECTIONS[key]
+		elif self.autopilot:
+			action = self.autopilot.next_action()
+		elif self.directions:
+			action, pressed = self.directions.popleft()
+			self.input_latency = self.input_latency * 0.8 + (now - pressed) * 0.2
+
+		# Only turns change the game, going on or turning back does not
+		if self.recorder and action not in (None, self.env.direction, SnakeEnv.OPPOSITE[self.env.direction]):
+			self.recorder.input(self.frame_count, self.REPLAY_KEYS[action])
+
+		state, reward, done = self.env.step(action)
+		self.points += max(0, reward)
+		return done
+
+	@property
+	def step(self):
+		return self.frame_count
+
+	# Everything the replay of a game has to end with
+	def digest(self):
+		return digest(self.frame_count, self.points, self.lives, list(self.env.body), self.env.apple, self.env.direction)
+
+	# Wait for keys until the deadline and queue the direction changes
+	def read_keys(self, deadline):
+		while True:
+			timeout = deadline - time.monotonic()
+			if timeout <= 0:
+				return
+
+			if not select.select([sys.stdin], [], [], timeout)[0]:
+				continue
+
+			while True:
+				try:
+					key = str(self.window.getkey()).upper()
+				except curses.error:
+					break
+				self.handle_key(key)
+
+	def handle_key(self, key):
+		# New directions are checked against the last queued one, so fast
+		# turns like up and then left are both kept
+		last = self.directions[-1][0] if self.directions else self.env.direction
+		direction = None
+
+		if (key == 'KEY_UP' or key == 'K') and last != self.DOWN:
+			direction = self.UP
+		elif (key == 'KEY_RIGHT' or key == 'L') and last != self.LEFT:
+			direction = self.RIGHT
+		elif (key == 'KEY_DOWN' or key == 'J') and last != self.UP:
+			direction = self.DOWN
+		elif (key == 'KEY_LEFT' or key == 'H') and last != self.RIGHT:
+			direction = self.LEFT
+		elif key == '+' or key == '=':
+			self.change_speed('+')
+		elif key == '-':
+			self.change_speed('-')
+		elif key == 'Q':
+			sys.exit()
+
+		if direction and direction != last and len(self.directions) < self.MAX_QUEUED_DIRECTIONS:
+			self.directions.append((direction, time.monotonic()))
+
+	# Speed changes are recorded for the next tick, so a replay plays at the
+	# speed the game was played at
+	def change_speed(self, key):
+		self.set_speed(1 if key == '+' else -1)
+		if self.recorder:
+			self.recorder.input(self.frame_count + 1, key)
+
+	def set_speed(self, change):
+		speeds = sorted(set(self.SPEEDS + [self.fps]))
+		index = min(max(0, speeds.index(self.fps) + change), len(speeds) - 1)
+		self.fps = speeds[index]
+
+
+	@traced('render_bar')
+	def render_bar(self):
+		self.bar.clear()
+
+		# Render FPS
+		if time.monotonic() - self.start_fps_time > 1:
+			self.current_fps = self.frame_count - self.start_fps_frame
+			self.start_fps_frame = self.frame_count
+			self.start_fps_time = time.monotonic()
+		self.bar.put(0, 0, 'Points: {}'.format(self.points))
+		if self.autopilot:
+			self.bar.put(0, 12, 'FPS {}/{} {:.1f}ms plan {:.2f}ms'.format(
+				self.current_fps, self.fps, self.frame_time * 1000, self.autopilot.plan_time * 1000
+			))
+		else:
+			self.bar.put(0, 12, 'FPS {}/{} {:.1f}ms lag {:.0f}ms'.format(
+				self.current_fps, self.fps, self.frame_time * 1000, self.input_latency * 1000
+			))
+
+		# Render Lives
+		self.bar.put(0, self.FIELD_SIZE * 2 - 10, 'Lives:')
+		self.bar.put(0, self.FIELD_SIZE * 2 - 3, '\u2764 ' * self.lives, curses.color_pair(1))
+
+		self.bar.present()
+
+	@traced('render_board')
+	def render_board(self):
+		if self.half_blocks:
+			self.put_half_blocks()
+		else:
+			self.put_spaces()
+
+		self.board.present()
+		if self.spectators:
+			with span('publish'):
+				self.spectators.publish(self.board)
+
+	# A cell is two spaces with a background color
+	def put_spaces(self):
+		self.board.clear()
+
+		# Up and bottom border
+		wall = curses.color_pair(4)
+		self.board.put(0, 0, '  ' * (self.FIELD_SIZE + 2), wall)
+		self.board.put(self.FIELD_SIZE + 1, 0, '  ' * (self.FIELD_SIZE + 2), wall)
+
+		# Left en right border
+		for x in range(1, self.FIELD_SIZE + 1):
+			self.board.put(x, 0, '  ', wall)
+			self.board.put(x, self.FIELD_SIZE * 2 + 2, '  ', wall)
+
+		# Snake
+		snake = curses.color_pair(3)
+		for part in self.env.body:
+			part_row, part_col = divmod(part, self.env.width)
+			self.board.put(part_row, part_col * 2, '  ', snake)
+
+		# Apple
+		if self.env.apple is not None:
+			apple_row, apple_col = divmod(self.env.apple, self.env.width)
+			self.board.put(apple_row, apple_col * 2, '  ', curses.color_pair(2))
+
+	# The cells of the field are numbered like the cells of SnakeEnv, a line
+	# of the board shows two rows of them
+	def put_half_blocks(self):
+		width = self.env.width
+		if self.blocks is None:
+			self.blocks = half_blocks(self.HALF_BLOCK_COLORS)
+			# An odd number of rows gets an empty row below
+			self.walls = bytearray(width * (width + width % 2))
+			for index in range(width * width):
+				row, coll = divmod(index, width)
+				if row in (0, width - 1) or coll in (0, width - 1):
+					self.walls[index] = self.WALL
+
+		cells = bytearray(self.walls)
+		for part in self.env.body:
+			cells[part] = self.BODY
+		if self.env.apple is not None:
+			cells[self.env.apple] = self.APPLE
+
+		blocks = self.blocks
+		for line in range(len(cells) // (width * 2)):
+			top = cells[line * 2 * width:(line * 2 + 1) * width]
+			bottom = cells[(line * 2 + 1) * width:(line * 2 + 2) * width]
+			self.board.put_cells(line, 0, [blocks[upper][lower] for upper, lower in zip(top, bottom)])
+
+
+def benchmark(games, steps, field_size, autopilot=None):
+	# Random turns every few steps, the same for every run
+	rng = random.Random(0)
+	actions = [rng.choice([None, None, None, SnakeEnv.UP, SnakeEnv.LEFT, SnakeEnv.DOWN, SnakeEnv.RIGHT]) for index in range(997)]
+
+	batch = SnakeBatch(games, field_size)
+	batch.reset()
+	pilots = [Autopilot(env, autopilot) for env in batch.envs] if autopilot else None
+
+	start = time.perf_counter()
+	deaths = 0
+	apples = 0
+	for step in range(steps):
+		if pilots:
+			step_actions = [pilot.next_action() for pilot in pilots]
+		else:
+			step_actions = [actions[(step + game) % len(actions)] for game in range(games)]
+
+		states, rewards, dones = batch.step(step_actions)
+		deaths += sum(dones)
+		apples += rewards.count(1)
+	elapsed = time.perf_counter() - start
+
+	print('{} games x {} steps on a {}x{} field in {:.2f}s'.format(games, steps, field_size, field_size, elapsed))
+	print('{:.0f} steps per second, {} apples, {} deaths'.format(games * steps / elapsed, apples, deaths))
+	if pilots:
+		print('Planning: {} plans, {:.3f}ms average and {:.3f}ms max per tick'.format(
+			sum(pilot.plans for pilot in pilots),
+			sum(pilot.plan_time for pilot in pilots) * 1000 / len(pilots),
+			max(pilot.max_plan_time for pilot in pilots) * 1000
+		))
+
+
+# Play a replay at full speed without a screen
+def fast_forward(replay):
+	start = time.perf_counter()
+	game = Snake(seed=replay.seed, replay=replay)
+	game.reset(True)
+	while game.frame_count < replay.last_step:
+		if game.tick():
+			game.reset()
+	replay.finish(game.digest(), time.perf_counter() - start)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Snake for the terminal.')
+	parser.add_argument('--benchmark', action='store_true', help='step games without a screen and report the speed')
+	parser.add_argument('--games', type=int, default=1000, help='number of games stepped together in the benchmark')
+	parser.add_argument('--steps', type=int, default=200, help='steps per game in the benchmark')
+	parser.add_argument('--size', type=int, default=Snake.FIELD_SIZE, help='field size of the benchmark games')
+	parser.add_argument('--autopilot', choices=Autopilot.STRATEGIES, help='let the snake play on its own')
+	parser.add_argument('--serve', metavar='ADDRESS', help='run a multiplayer server on host:port or a Unix socket path')
+	parser.add_argument('--connect', metavar='ADDRESS', help='join a multiplayer server')
+	parser.add_argument('--load-test', type=int, metavar='CLIENTS', help='run a server with bot clients on a local socket')
+	parser.add_argument('--seconds', type=int, default=10, help='duration of the load test')
+	parser.add_argument('--seed', type=int, help='seed of the apples, random by default')
+	add_arguments(parser)
+	args = parser.parse_args()
+
+	if args.benchmark:
+		benchmark(args.games, args.steps, args.size, args.autopilot)
+		return
+
+	if args.load_test or args.serve or args.connect:
+		# Only multiplayer needs asyncio and sockets, keep them out of startup
+		from . import snake_net
+		snake_net.main(args)
+		return
+
+	run(args, 'snake', Snake, {'autopilot': args.autopilot}, fast_forward)
+
+if __name__ == '__main__':
+	main()
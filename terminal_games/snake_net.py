@@ -0,0 +1,448 @@
+# Multiplayer Snake over TCP or a Unix socket
+# Copyright (C) 2017 Maikel Martens
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import curses
+import random
+import select
+import asyncio
+import json
+import os
+import socket
+import tempfile
+from collections import defaultdict, deque
+
+from .framebuffer import FrameBuffer
+from .snake import Snake, SnakeEnv
+
+
+class SnakeWorld(SnakeEnv):
+	# Several snakes on one field, the server runs this. Every tick returns a
+	# delta with only what changed, which is what the clients receive.
+
+	RESPAWN_TICKS = 12
+
+	def __init__(self, field_size=25, seed=None):
+		super().__init__(field_size)
+		self.random.seed(seed)
+		self.snakes = {}
+		self.inputs = {}
+		self.next_id = 1
+		self.tick = 0
+
+		# Changes made outside of a tick, sent with the next delta
+		self.removed = []
+		self.left = []
+		self.joined = []
+		self.spawned = []
+
+		self.clear_field()
+		self.place_apple()
+
+	def join(self):
+		snake_id = self.next_id
+		self.next_id += 1
+		self.snakes[snake_id] = {'body': deque(), 'direction': self.UP, 'score': 0, 'respawn': 0}
+		self.joined.append([snake_id, self.spawn(snake_id)])
+		return snake_id
+
+	def leave(self, snake_id):
+		snake = self.snakes.pop(snake_id)
+		self.inputs.pop(snake_id, None)
+		for cell in snake['body']:
+			self.vacate(cell)
+
+		self.joined = [entry for entry in self.joined if entry[0] != snake_id]
+		self.left.append(snake_id)
+
+	def spawn(self, snake_id):
+		snake = self.snakes[snake_id]
+		cell = self.random.choice(self.free_cells)
+		if cell == self.apple:
+			cell = self.free_cells[0] if self.free_cells[0] != cell else self.free_cells[-1]
+
+		snake['body'] = deque([cell])
+		snake['direction'] = self.random.choice(list(self.steps))
+		self.occupy(cell)
+		return [cell]
+
+	# Input of a client, only the last direction before the tick counts
+	def steer(self, snake_id, direction):
+		if snake_id in self.snakes:
+			self.inputs[snake_id] = direction
+
+	def step(self, action=None):
+		self.tick += 1
+		heads = {}
+		moved = []
+		died = []
+		apple = self.apple
+
+		for snake_id, snake in self.snakes.items():
+			if not snake['body']:
+				continue
+			direction = self.inputs.get(snake_id)
+			if direction and (len(snake['body']) == 1 or direction != self.OPPOSITE[snake['direction']]):
+				snake['direction'] = direction
+			heads[snake_id] = snake['body'][-1] + self.steps[snake['direction']]
+		self.inputs.clear()
+
+		# Tails move first, so a snake can follow another one closely
+		for snake_id, head in heads.items():
+			if head != apple:
+				tail = self.snakes[snake_id]['body'].popleft()
+				self.vacate(tail)
+				self.removed.append(tail)
+
+		targets = defaultdict(int)
+		for head in heads.values():
+			targets[head] += 1
+
+		for snake_id, head in heads.items():
+			snake = self.snakes[snake_id]
+			if self.occupied[head] or targets[head] > 1:
+				died.append(snake_id)
+				for cell in snake['body']:
+					self.vacate(cell)
+					self.removed.append(cell)
+				snake['body'] = deque()
+				snake['respawn'] = self.RESPAWN_TICKS
+				continue
+
+			snake['body'].append(head)
+			self.occupy(head)
+			moved.append([snake_id, head])
+			if head == apple:
+				snake['score'] += 1
+
+		if self.apple in heads.values() or (self.apple is None and self.free_cells):
+			self.place_apple()
+
+		for snake_id, snake in self.snakes.items():
+			if not snake['body'] and snake_id not in died:
+				snake['respawn'] -= 1
+				if snake['respawn'] <= 0 and self.free_cells:
+					self.spawned.append([snake_id, self.spawn(snake_id)])
+
+		delta = {'t': self.tick}
+		if self.left:
+			delta['l'] = self.left
+		if self.joined:
+			delta['j'] = self.joined
+		if moved:
+			delta['m'] = moved
+		if self.removed:
+			delta['r'] = self.removed
+		if died:
+			delta['d'] = died
+		if self.spawned:
+			delta['s'] = self.spawned
+		if self.apple != apple:
+			delta['a'] = self.apple
+			delta['p'] = [[snake_id, snake['score']] for snake_id, snake in self.snakes.items() if snake['body'] and snake['body'][-1] == apple]
+		self.removed = []
+		self.left = []
+		self.joined = []
+		self.spawned = []
+		return delta
+
+	# Full state for a client that just joined
+	def keyframe(self, snake_id):
+		return {
+			'k': self.field_size,
+			't': self.tick,
+			'you': snake_id,
+			'a': self.apple,
+			'snakes': [[other_id, list(snake['body']), snake['score']] for other_id, snake in self.snakes.items()],
+		}
+
+
+class SnakeServer:
+	# Authoritative tick loop for SnakeWorld, clients connect over TCP or a
+	# Unix socket and talk newline separated JSON. The server sends a
+	# keyframe on join and a delta every tick, clients send a direction.
+
+	KEYS = {'U': SnakeEnv.UP, 'D': SnakeEnv.DOWN, 'L': SnakeEnv.LEFT, 'R': SnakeEnv.RIGHT}
+
+	# Clients that can't keep up with the deltas are dropped
+	MAX_CLIENT_BUFFER = 1 << 20
+
+	def __init__(self, field_size=25, fps=Snake.FPS, seed=None):
+		self.world = SnakeWorld(field_size, seed)
+		self.fps = fps
+		self.clients = {}
+		self.handlers = set()
+
+		# Tick timing, the time spent on a tick and how late ticks started
+		self.ticks = 0
+		self.tick_time = 0
+		self.max_lateness = 0
+		self.bytes_sent = 0
+
+	async def serve(self, address, duration=None):
+		if isinstance(address, tuple):
+			server = await asyncio.start_server(self.handle_client, *address)
+		else:
+			server = await asyncio.start_unix_server(self.handle_client, address)
+
+		async with server:
+			await self.run(duration)
+
+			# Let the clients finish before the server closes
+			for writer in self.clients.values():
+				writer.close()
+			await asyncio.gather(*self.handlers, return_exceptions=True)
+
+	async def run(self, duration=None):
+		loop = asyncio.get_running_loop()
+		start = next_tick = loop.time()
+
+		while duration is None or loop.time() - start < duration:
+			next_tick += 1.0 / self.fps
+			await asyncio.sleep(max(0, next_tick - loop.time()))
+
+			tick_start = loop.time()
+			self.max_lateness = max(self.max_lateness, tick_start - next_tick)
+			if tick_start - next_tick > 1.0 / self.fps:
+				next_tick = tick_start
+
+			data = (json.dumps(self.world.step(), separators=(',', ':')) + '\n').encode()
+			for snake_id, writer in list(self.clients.items()):
+				if writer.transport.get_write_buffer_size() > self.MAX_CLIENT_BUFFER:
+					writer.close()
+					continue
+				writer.write(data)
+				self.bytes_sent += len(data)
+
+			self.ticks += 1
+			self.tick_time += loop.time() - tick_start
+
+	async def handle_client(self, reader, writer):
+		self.handlers.add(asyncio.current_task())
+		snake_id = self.world.join()
+		writer.write((json.dumps(self.world.keyframe(snake_id), separators=(',', ':')) + '\n').encode())
+		self.clients[snake_id] = writer
+
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				direction = line.strip().decode()
+				if direction in self.KEYS:
+					self.world.steer(snake_id, self.KEYS[direction])
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			del self.clients[snake_id]
+			self.world.leave(snake_id)
+			writer.close()
+			self.handlers.discard(asyncio.current_task())
+
+
+# State of the world on a client, kept up to date from the server messages
+class WorldView:
+	def __init__(self):
+		self.field_size = 0
+		self.width = 0
+		self.you = None
+		self.tick = 0
+		self.apple = None
+		self.snakes = {}
+		self.scores = {}
+		self.cells = {}
+
+	def apply(self, message):
+		if 'k' in message:
+			self.field_size = message['k']
+			self.width = self.field_size + 2
+			self.you = message['you']
+			self.snakes = {}
+			self.scores = {}
+			self.cells = {}
+			for snake_id, body, score in message['snakes']:
+				self.snakes[snake_id] = deque(body)
+				self.scores[snake_id] = score
+				for cell in body:
+					self.cells[cell] = snake_id
+
+		# Snakes left and joined before the tick, in that order as a join
+		# can take the cells of a snake that left. Respawns come after it.
+		self.tick = message['t']
+		for snake_id in message.get('l', ()):
+			for cell in self.snakes.pop(snake_id, ()):
+				self.cells.pop(cell, None)
+			self.scores.pop(snake_id, None)
+		self.place(message.get('j', ()))
+		for cell in message.get('r', ()):
+			snake_id = self.cells.pop(cell, None)
+			if snake_id in self.snakes and self.snakes[snake_id] and self.snakes[snake_id][0] == cell:
+				self.snakes[snake_id].popleft()
+		for snake_id in message.get('d', ()):
+			self.snakes[snake_id] = deque()
+		for snake_id, head in message.get('m', ()):
+			self.snakes.setdefault(snake_id, deque()).append(head)
+			self.cells[head] = snake_id
+		self.place(message.get('s', ()))
+		for snake_id, score in message.get('p', ()):
+			self.scores[snake_id] = score
+		if 'a' in message:
+			self.apple = message['a']
+
+	def place(self, spawns):
+		for snake_id, body in spawns:
+			self.snakes[snake_id] = deque(body)
+			self.scores.setdefault(snake_id, 0)
+			for cell in body:
+				self.cells[cell] = snake_id
+
+
+class SnakeClient:
+	# Terminal client for SnakeServer
+
+	KEYS = {'KEY_UP': 'U', 'K': 'U', 'KEY_DOWN': 'D', 'J': 'D', 'KEY_LEFT': 'L', 'H': 'L', 'KEY_RIGHT': 'R', 'L': 'R'}
+
+	def __init__(self, address):
+		self.address = address
+		self.view = WorldView()
+
+	def __call__(self, window):
+		self.window = window
+		family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+		self.socket = socket.socket(family, socket.SOCK_STREAM)
+		self.socket.connect(self.address)
+		self.socket.setblocking(False)
+
+		curses.curs_set(0)
+		self.window.nodelay(True)
+		curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_WHITE)
+		curses.init_pair(2, curses.COLOR_WHITE, curses.COLOR_YELLOW)
+		curses.init_pair(3, curses.COLOR_WHITE, curses.COLOR_CYAN)
+		curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_MAGENTA)
+		self.screen = FrameBuffer(self.window, *self.window.getmaxyx())
+
+		buffer = b''
+		while True:
+			readable = select.select([self.socket, sys.stdin], [], [])[0]
+
+			if sys.stdin in readable:
+				while True:
+					try:
+						key = str(self.window.getkey()).upper()
+					except curses.error:
+						break
+					if key == 'Q':
+						return
+					if key in self.KEYS:
+						self.socket.sendall((self.KEYS[key] + '\n').encode())
+
+			if self.socket in readable:
+				data = self.socket.recv(65536)
+				if not data:
+					return
+				buffer += data
+				*lines, buffer = buffer.split(b'\n')
+				for line in lines:
+					self.view.apply(json.loads(line))
+				if lines:
+					self.render()
+
+	def render(self):
+		view = self.view
+		self.screen.clear()
+		self.screen.put(0, 0, 'Tick {}  Score {}  Snakes {}'.format(
+			view.tick, view.scores.get(view.you, 0), sum(1 for body in view.snakes.values() if body)
+		))
+
+		for x in range(view.field_size + 2):
+			for row, col in ((0, x), (view.field_size + 1, x), (x, 0), (x, view.field_size + 1)):
+				self.screen.put(row + 1, col * 2, '  ', curses.color_pair(1))
+
+		for cell, snake_id in view.cells.items():
+			row, col = divmod(cell, view.width)
+			self.screen.put(row + 1, col * 2, '  ', curses.color_pair(3 if snake_id == view.you else 4))
+
+		if view.apple is not None:
+			row, col = divmod(view.apple, view.width)
+			self.screen.put(row + 1, col * 2, '  ', curses.color_pair(2))
+		self.screen.present()
+		curses.doupdate()
+
+
+def parse_address(text):
+	# host:port for TCP, anything else is the path of a Unix socket
+	host, separator, port = text.rpartition(':')
+	if separator and port.isdigit():
+		return (host or 'localhost', int(port))
+	return text
+
+
+async def load_test(clients, seconds, field_size, fps):
+	# Server and bot clients on a Unix socket in one process
+	path = os.path.join(tempfile.mkdtemp(), 'snake.sock')
+	server = SnakeServer(field_size, fps, seed=0)
+	received = [0] * clients
+	server_task = asyncio.ensure_future(server.serve(path, seconds))
+	await asyncio.sleep(0.1)
+
+	async def client(index):
+		reader, writer = await asyncio.open_unix_connection(path)
+		rng = random.Random(index)
+		view = WorldView()
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				view.apply(json.loads(line))
+				received[index] += len(line)
+				if rng.random() < 0.3:
+					writer.write((rng.choice('UDLR') + '\n').encode())
+		except ConnectionError:
+			pass
+
+	client_tasks = [asyncio.ensure_future(client(index)) for index in range(clients)]
+	await server_task
+	for task in client_tasks:
+		task.cancel()
+	await asyncio.gather(*client_tasks, return_exceptions=True)
+	os.unlink(path)
+
+	ticks = max(1, server.ticks)
+	print('{} clients, {} ticks in {}s ({:.1f} ticks/s, target {})'.format(clients, server.ticks, seconds, server.ticks / float(seconds), fps))
+	print('Tick time {:.3f}ms average, max lateness {:.2f}ms'.format(server.tick_time * 1000 / ticks, server.max_lateness * 1000))
+	print('{:.0f} bytes per client per tick'.format(sum(received) / float(ticks * clients)))
+
+
+
+# Called by snake.main for --load-test, --serve and --connect
+def main(args):
+	if args.load_test:
+		asyncio.run(load_test(args.load_test, args.seconds, args.size, Snake.FPS))
+		return
+
+	if args.serve:
+		try:
+			asyncio.run(SnakeServer(args.size).serve(parse_address(args.serve)))
+		except KeyboardInterrupt:
+			pass
+		return
+
+	if args.connect:
+		try:
+			curses.wrapper(SnakeClient(parse_address(args.connect)))
+		except KeyboardInterrupt:
+			pass
@@ -0,0 +1,243 @@
+# Spectators for Snake and Color Wars
+#
+# A game started with --spectate PATH publishes its board on a Unix socket,
+# any number of viewers can watch it with --watch PATH. Messages are JSON
+# lines. A keyframe has the whole board and the color pairs, after that
+# deltas have the runs of cells the frame buffer of the board wrote:
+#
+#   {"size": [rows, colls], "pairs": [[pair, fg, bg], ...], "runs": [[row, coll, text, attr], ...]}
+#   {"runs": [[row, coll, text, attr], ...]}
+#
+# Publishing never blocks the game. Sockets are non-blocking and every
+# viewer has a queue of at most QUEUE_FRAMES frames. A viewer that falls
+# further behind loses its queue and gets a keyframe instead.
+
+import os
+import sys
+import json
+import stat
+import time
+import atexit
+import curses
+import select
+import socket
+from itertools import groupby
+from collections import deque
+
+from .framebuffer import FrameBuffer
+
+QUEUE_FRAMES = 8
+
+
+class Viewer:
+	def __init__(self, connection):
+		self.connection = connection
+		self.queue = deque()
+		# Rest of the message that is being sent, it can't be dropped
+		self.sending = b''
+		self.keyframe = True
+
+
+class Broadcaster:
+	def __init__(self, path, pairs):
+		self.path = path
+		self.pairs = [[pair, fg, bg] for pair, (fg, bg) in sorted(pairs.items())]
+		self.viewers = []
+		self.buffer = None
+
+		# A socket left behind by a game that crashed is replaced
+		if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+			os.unlink(path)
+		self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.server.bind(path)
+		self.server.listen()
+		self.server.setblocking(False)
+		atexit.register(self.close)
+
+		# Counters of all frames
+		self.frames = 0
+		self.keyframes = 0
+		self.dropped = 0
+		self.bytes = 0
+		self.time = 0
+
+	# Called after buffer.present(), queues the frame for every viewer and
+	# sends what the sockets take right now
+	def publish(self, buffer):
+		start = time.perf_counter()
+		self.accept()
+
+		changes = buffer.changes
+		if buffer is not self.buffer:
+			# A new or resized buffer, every viewer starts over
+			self.buffer = buffer
+			for viewer in self.viewers:
+				viewer.keyframe = True
+
+		delta = keyframe = None
+		for viewer in self.viewers:
+			if len(viewer.queue) >= QUEUE_FRAMES:
+				viewer.keyframe = True
+
+			if viewer.keyframe:
+				# The keyframe has everything that was queued
+				self.dropped += len(viewer.queue)
+				viewer.queue.clear()
+				keyframe = keyframe or self.encode({'size': [buffer.rows, buffer.colls], 'pairs': self.pairs, 'runs': self.runs(buffer)})
+				viewer.queue.append(keyframe)
+				viewer.keyframe = False
+				self.keyframes += 1
+			elif changes:
+				delta = delta or self.encode({'runs': changes})
+				viewer.queue.append(delta)
+			self.send(viewer)
+
+		self.viewers = [viewer for viewer in self.viewers if viewer.connection]
+		# Without viewers the buffer does not collect its runs, a new viewer
+		# starts with a keyframe anyway
+		buffer.changes = [] if self.viewers else None
+		self.frames += 1
+		self.time += time.perf_counter() - start
+
+	def accept(self):
+		while True:
+			try:
+				connection, address = self.server.accept()
+			except (BlockingIOError, InterruptedError):
+				return
+			connection.setblocking(False)
+			self.viewers.append(Viewer(connection))
+
+	def send(self, viewer):
+		try:
+			while viewer.sending or viewer.queue:
+				if not viewer.sending:
+					viewer.sending = viewer.queue.popleft()
+				sent = viewer.connection.send(viewer.sending)
+				self.bytes += sent
+				viewer.sending = viewer.sending[sent:]
+		except (BlockingIOError, InterruptedError):
+			pass
+		except OSError:
+			# The viewer went away
+			viewer.connection.close()
+			viewer.connection = None
+
+	@staticmethod
+	def encode(message):
+		return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+	# The whole screen of a buffer as runs of cells that share an attribute
+	@staticmethod
+	def runs(buffer):
+		runs = []
+		for row, cells in enumerate(buffer.front):
+			coll = 0
+			for attr, run in groupby(cells, lambda cell: cell[1] if cell else 0):
+				text = ''.join(cell[0] if cell else ' ' for cell in run)
+				runs.append((row, coll, text, attr))
+				coll += len(text)
+		return runs
+
+	def close(self):
+		for viewer in self.viewers:
+			viewer.connection.close()
+		self.viewers = []
+		if self.server:
+			self.server.close()
+			self.server = None
+			os.unlink(self.path)
+
+
+class Watcher:
+	# Terminal client for a Broadcaster, the board is drawn through a frame
+	# buffer so only what changed is written
+
+	def __init__(self, connection, path):
+		self.connection = connection
+		self.path = path
+		self.screen = None
+		self.status_row = 0
+		self.frames = 0
+		self.keyframes = 0
+
+	def __call__(self, window):
+		self.window = window
+		curses.curs_set(0)
+		self.window.nodelay(True)
+		self.window.clear()
+		self.window.refresh()
+
+		buffer = b''
+		while True:
+			readable = select.select([self.connection, sys.stdin], [], [])[0]
+
+			if sys.stdin in readable:
+				while True:
+					try:
+						key = str(self.window.getkey()).upper()
+					except curses.error:
+						break
+					if key == 'Q':
+						return
+
+			if self.connection in readable:
+				data = self.connection.recv(65536)
+				if not data:
+					self.status('The game has ended, press a key')
+					curses.doupdate()
+					self.window.nodelay(False)
+					self.window.getkey()
+					return
+				buffer += data
+				*lines, buffer = buffer.split(b'\n')
+				for line in lines:
+					self.apply(json.loads(line))
+
+				# Everything that came in is drawn as one frame
+				if lines and self.screen:
+					self.screen.present()
+					self.status('Watching {}: {} frames, {} keyframes, Q to quit'.format(self.path, self.frames, self.keyframes))
+					curses.doupdate()
+
+	def apply(self, message):
+		if 'size' in message:
+			rows, colls = message['size']
+			for pair, fg, bg in message['pairs']:
+				curses.init_pair(pair, fg, bg)
+
+			# A pad, the board may be bigger than this terminal
+			screen_rows, screen_colls = self.window.getmaxyx()
+			self.pad = curses.newpad(rows + 1, colls + 1)
+			self.screen = FrameBuffer(self.pad, rows, colls,
+				(0, 0, 0, 0, min(rows, screen_rows - 1) - 1, min(colls, screen_colls) - 1))
+			self.status_row = min(rows, screen_rows - 1)
+			self.window.clear()
+			self.window.noutrefresh()
+			self.keyframes += 1
+
+		for row, coll, text, attr in message['runs']:
+			self.screen.put(row, coll, text, attr)
+		self.frames += 1
+
+	def status(self, text):
+		screen_rows, screen_colls = self.window.getmaxyx()
+		try:
+			self.window.addstr(self.status_row, 0, text[:screen_colls - 1])
+			self.window.clrtoeol()
+		except curses.error:
+			pass
+		self.window.noutrefresh()
+
+
+def watch(path):
+	connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		connection.connect(path)
+	except (FileNotFoundError, ConnectionRefusedError):
+		sys.exit('No game to watch at {}'.format(path))
+
+	try:
+		curses.wrapper(Watcher(connection, path))
+	except KeyboardInterrupt:
+		pass
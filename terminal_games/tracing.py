@@ -0,0 +1,144 @@
+# Tracing spans for the terminal games
+#
+# Set TERMINAL_GAMES_TRACE to a file name to record spans while playing:
+#
+#   TERMINAL_GAMES_TRACE=snake-trace.json python3 snake.py
+#
+# Spans go into a ring buffer that keeps the last TRACE_SIZE of them. On
+# exit they are written as Chrome trace JSON (open it in chrome://tracing
+# or ui.perfetto.dev) and a summary per phase is printed. Without the
+# variable span() returns one shared no-op context manager and traced()
+# leaves the function as it is.
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+
+TRACE_FILE = os.environ.get('TERMINAL_GAMES_TRACE')
+TRACE_SIZE = 1 << 16
+
+
+class Tracer:
+	def __init__(self, size=TRACE_SIZE):
+		self.size = size
+		self.names = [None] * size
+		self.starts = [0] * size
+		self.ends = [0] * size
+		self.threads = [0] * size
+		self.count = 0
+		self.origin = time.perf_counter_ns()
+		# The bots record spans in their own thread, a slot is taken and
+		# written under the lock
+		self.lock = threading.Lock()
+
+	def record(self, name, start, end):
+		thread = threading.get_ident()
+		with self.lock:
+			index = self.count % self.size
+			self.names[index] = name
+			self.starts[index] = start
+			self.ends[index] = end
+			self.threads[index] = thread
+			self.count += 1
+
+	def spans(self):
+		# Oldest first, only what is still in the ring
+		first = max(0, self.count - self.size)
+		for number in range(first, self.count):
+			index = number % self.size
+			yield self.names[index], self.starts[index], self.ends[index], self.threads[index]
+
+	def chrome_trace(self):
+		threads = {}
+		events = []
+		for name, start, end, thread in self.spans():
+			events.append({
+				'name': name,
+				'ph': 'X',
+				'ts': (start - self.origin) / 1000,
+				'dur': (end - start) / 1000,
+				'pid': os.getpid(),
+				'tid': threads.setdefault(thread, len(threads)),
+			})
+		return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+	def summary(self):
+		durations = {}
+		for name, start, end, thread in self.spans():
+			durations.setdefault(name, []).append((end - start) / 1e6)
+
+		lines = ['{:<16} {:>8} {:>10} {:>9} {:>9} {:>9}'.format('Phase', 'Count', 'Total ms', 'Mean ms', 'P95 ms', 'Max ms')]
+		for name, times in sorted(durations.items(), key=lambda item: -sum(item[1])):
+			times.sort()
+			lines.append('{:<16} {:>8} {:>10.1f} {:>9.3f} {:>9.3f} {:>9.3f}'.format(
+				name, len(times), sum(times), sum(times) / len(times), times[len(times) * 95 // 100], times[-1]
+			))
+		if self.count > self.size:
+			lines.append('Only the last {} of {} spans are kept'.format(self.size, self.count))
+		return '\n'.join(lines)
+
+	def dump(self, path):
+		with open(path, 'w') as handle:
+			json.dump(self.chrome_trace(), handle)
+		sys.stderr.write('Trace with {} spans written to {}\n{}\n'.format(min(self.count, self.size), path, self.summary()))
+
+
+class Span:
+	__slots__ = ('name', 'start')
+
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter_ns()
+		return self
+
+	def __exit__(self, *exc_info):
+		tracer.record(self.name, self.start, time.perf_counter_ns())
+
+
+class NullSpan:
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		pass
+
+
+NULL_SPAN = NullSpan()
+
+
+def null_span(name):
+	return NULL_SPAN
+
+
+# Decorator that records every call of a function as a span
+def traced(name):
+	def decorate(function):
+		if tracer is None:
+			return function
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			start = time.perf_counter_ns()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				tracer.record(name, start, time.perf_counter_ns())
+		return wrapper
+	return decorate
+
+
+if TRACE_FILE:
+	tracer = Tracer()
+	span = Span
+	atexit.register(tracer.dump, TRACE_FILE)
+else:
+	tracer = None
+	span = null_span
@@ -0,0 +1,77 @@
+import unittest
+
+from terminal_games.color_wars import BorderIndex, GameState, PuzzleState, zobrist_key
+
+
+class BorderIndexTest(unittest.TestCase):
+	# The incremental border index of the bots has to match a flood of the
+	# whole board after every move
+
+	def assert_border(self, state, player, gains):
+		self.assertEqual(gains, state.color_gains(player), 'player {} after {} moves'.format(player.number, state.moves))
+
+	def play(self, state, indexes):
+		while not state.game_won() and state.moves < state.field_size * state.field_size:
+			for player in (state.current_player, state.other_player):
+				self.assert_border(state, player, player.border.sync(state, player))
+				# An index that outlives the players is rebuilt for a new game
+				self.assert_border(state, player, indexes[player.number].sync(state, player))
+			state.apply_move(state.current_player.pick_color(state, None))
+
+	def test_bot_games(self):
+		for seed, field_size in ((1, 8), (2, 12), (3, 17), (5, 25), (6, 40)):
+			with self.subTest(seed=seed, field_size=field_size):
+				state = GameState(field_size, ('easy', 'easy'), seed)
+				self.play(state, {1: BorderIndex(), 2: BorderIndex()})
+
+	def test_reset(self):
+		state = GameState(12, ('easy', 'easy'), 4)
+		indexes = {1: BorderIndex(), 2: BorderIndex()}
+		for game in range(3):
+			self.play(state, indexes)
+			state.reset()
+
+
+
+class HashTest(unittest.TestCase):
+	# The Zobrist hash is updated move by move, it has to be the hash of the
+	# colors and cells of the players in the game and of the side to move
+
+	def assert_hash(self, state):
+		expected = zobrist_key(0) if state.moves % 2 else 0
+		for player in (state.current_player, state.other_player):
+			if player.color is not None:
+				expected ^= player.zobrist_color() ^ player.zobrist_cells(player.cells)
+		self.assertEqual(state.hash, expected)
+
+	def play(self, state):
+		self.assert_hash(state)
+		while not state.game_won() and state.moves < state.field_size * state.field_size:
+			color = state.current_player.pick_color(state, None)
+			state.make_move(color)
+			self.assert_hash(state)
+			state.unmake_move()
+			self.assert_hash(state)
+			state.apply_move(color)
+			self.assert_hash(state)
+
+	def test_game(self):
+		state = GameState(15, ('easy', 'easy'), 7)
+		self.play(state)
+		state.reset()
+		self.play(state)
+
+	def test_puzzle(self):
+		state = PuzzleState(10, (None, None), 3)
+		# Nobody starts in the top right corner
+		self.assertEqual(state.other_player.cells, 0)
+		self.assertEqual(state.current_player.cells & state.board.bit(0, 9), 0)
+		self.assert_hash(state)
+		for color in state.solver.solution:
+			state.apply_move(color)
+			self.assert_hash(state)
+		self.assertTrue(state.game_won())
+
+
+if __name__ == '__main__':
+	unittest.main()
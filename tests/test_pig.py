@@ -0,0 +1,27 @@
+import unittest
+
+from terminal_games.pig import PigPolicy, evaluate
+
+
+class EvaluateTest(unittest.TestCase):
+    # The exact evaluation of the solved policy against itself has to give
+    # the chance the solver found for the first player
+
+    def test_optimal_matches_the_solver(self):
+        chance = PigPolicy.load().win_chance(0, 0)
+        self.assertAlmostEqual(chance, 0.5306, places=4)
+        first, turns = evaluate(['optimal', 'optimal'])
+        self.assertAlmostEqual(first, chance, places=6)
+
+    def test_seat_orders(self):
+        first, first_turns = evaluate(['optimal', 'hold20'])
+        second, second_turns = evaluate(['hold20', 'optimal'])
+        # The optimal policy wins from both seats, the first seat wins more
+        self.assertGreater(first, 1 - second)
+        self.assertGreater(1 - second, 0.5)
+        # A second evaluation comes from the cached turns
+        self.assertEqual(evaluate(['optimal', 'hold20']), (first, first_turns))
+
+
+if __name__ == '__main__':
+    unittest.main()
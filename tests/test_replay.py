@@ -0,0 +1,165 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from terminal_games import color_wars, snake
+from terminal_games.replay import (
+	VERSION, Recorder, Replay, ReplayError, digest, read_varint, write_varint,
+)
+
+
+class ReplayTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.directory.name, 'game.replay')
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def record(self, game='snake', seed=1234, inputs=((3, 'U'), (3, 'L'), (10, b'\x00\xff'), (400, 'R'))):
+		recorder = Recorder(self.path, game, seed, {'size': 25})
+		for step, data in inputs:
+			recorder.input(step, data)
+		recorder.end(500, digest('final', 500))
+
+	def data(self):
+		with open(self.path, 'rb') as handle:
+			return handle.read()
+
+	def write(self, data):
+		with open(self.path, 'wb') as handle:
+			handle.write(data)
+
+	# Playback output and the exit code, None when it did not exit
+	def finish(self, replay, state_digest):
+		output = io.StringIO()
+		with redirect_stdout(output):
+			try:
+				replay.finish(state_digest)
+			except SystemExit as exit:
+				return output.getvalue(), exit.code
+		return output.getvalue(), None
+
+	def test_varint(self):
+		values = [0, 1, 127, 128, 255, 300, 16383, 16384, 1 << 32, (1 << 64) - 1]
+		data = bytearray()
+		for value in values:
+			write_varint(data, value)
+
+		position = 0
+		for value in values:
+			read, position = read_varint(data, position)
+			self.assertEqual(read, value)
+		self.assertEqual(position, len(data))
+
+		# Small numbers take one byte
+		data = bytearray()
+		write_varint(data, 127)
+		self.assertEqual(data, b'\x7f')
+
+	def test_round_trip(self):
+		self.record()
+		replay = Replay.load(self.path, 'snake')
+		self.assertEqual(replay.game, 'snake')
+		self.assertEqual(replay.seed, 1234)
+		self.assertEqual(replay.settings, {'size': 25})
+		self.assertEqual([(step, data) for step, milliseconds, data in replay.inputs],
+			[(3, b'U'), (3, b'L'), (10, b'\x00\xff'), (400, b'R')])
+		self.assertEqual(replay.end[0], 500)
+		self.assertEqual(replay.end[2], digest('final', 500))
+		self.assertEqual(replay.last_step, 500)
+
+	def test_truncated(self):
+		self.record()
+		data = self.data()
+
+		# Cut off in the last input, the inputs before it are kept
+		self.write(data[:-25])
+		replay = Replay.load(self.path)
+		self.assertIsNone(replay.end)
+		self.assertEqual([step for step, milliseconds, data in replay.inputs], [3, 3, 10])
+		self.assertEqual(replay.last_step, 10)
+		output, code = self.finish(replay, digest('final', 500))
+		self.assertIn('cut off', output)
+		self.assertIsNone(code)
+
+		# Cut off in the header
+		self.write(data[:12])
+		with self.assertRaises(ReplayError):
+			Replay.load(self.path)
+
+	def test_wrong_game_or_version(self):
+		self.record()
+		with self.assertRaises(ReplayError):
+			Replay.load(self.path, 'color-wars')
+
+		data = self.data()
+		self.write(data[:4] + bytes((VERSION + 1,)) + data[5:])
+		with self.assertRaises(ReplayError):
+			Replay.load(self.path, 'snake')
+
+		self.write(b'not a replay')
+		with self.assertRaises(ReplayError):
+			Replay.load(self.path)
+
+	def test_digest_mismatch(self):
+		self.record()
+		replay = Replay.load(self.path)
+
+		output, code = self.finish(replay, digest('final', 500))
+		self.assertIn('matches', output)
+		self.assertIsNone(code)
+
+		output, code = self.finish(replay, digest('final', 501))
+		self.assertIn('differs', output)
+		self.assertEqual(code, 1)
+
+	def fast_forward(self, game, module):
+		replay = Replay.load(self.path, game)
+		output = io.StringIO()
+		with redirect_stdout(output):
+			module.fast_forward(replay)
+		self.assertIn('The final state matches the recording', output.getvalue())
+
+	# A game played like the screen plays it, without the screen
+	def test_snake_fast_forward(self):
+		seed = 99
+		game = snake.Snake('astar', seed, Recorder(self.path, 'snake', seed, {'autopilot': 'astar'}))
+		game.reset(True)
+		for tick in range(3000):
+			if tick == 100:
+				game.change_speed('+')
+			if game.tick():
+				game.reset()
+		game.recorder.end(game.step, game.digest())
+
+		self.assertTrue(Replay.load(self.path).inputs)
+		self.fast_forward('snake', snake)
+
+	def test_color_wars_fast_forward(self):
+		seed = 42
+		settings = {'level': 'easy', 'size': 12, 'puzzle': False}
+		engine = color_wars.GameEngine.create(settings, seed, False, Recorder(self.path, 'color-wars', seed, settings))
+		rng = random.Random(seed)
+		for game in range(2):
+			state = engine.state
+			while not state.game_won() and state.moves < 144:
+				if isinstance(state.current_player, color_wars.BotPlayer):
+					color = state.current_player.pick_color(state, None)
+				else:
+					color = rng.choice([color for color in color_wars.Colors.COLORS if state.color_free(color)])
+				state.apply_move(color)
+				engine.moves += 1
+				engine.record(str(color))
+			engine.record('N')
+			state.reset()
+		engine.recorder.end(engine.step, engine.digest())
+
+		self.fast_forward('color-wars', color_wars)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from terminal_games.snake import Autopilot, SnakeEnv
+
+
+class HamiltonCycleTest(unittest.TestCase):
+	def cycle_cells(self, cycle, start):
+		cells = [start]
+		while cycle[cells[-1]] != start:
+			cells.append(cycle[cells[-1]])
+		return cells
+
+	def test_covers_the_field(self):
+		for size in (24, 25):
+			with self.subTest(size=size):
+				env = SnakeEnv(size)
+				cycle = Autopilot(env, 'hamilton').hamilton_cycle()
+				cells = self.cycle_cells(cycle, env.cell(1, 1))
+
+				field = set(env.cell(row, col) for row in range(1, size + 1) for col in range(1, size + 1))
+				# An odd field leaves out the bottom left corner
+				if size % 2:
+					field.remove(env.cell(size, 1))
+				self.assertEqual(set(cells), field)
+				self.assertEqual(len(cells), len(field))
+				for cell in cells:
+					self.assertIn(cycle[cell] - cell, env.steps.values())
+
+	def test_escape_follows_the_cycle(self):
+		env = SnakeEnv(25)
+		env.reset(0)
+		autopilot = Autopilot(env, 'bfs')
+		head = env.body[-1]
+
+		# Wall the apple in, there is no path to it
+		for step in env.steps.values():
+			env.occupied[env.apple + step] = 1
+
+		cycle = autopilot.hamilton_cycle()
+		self.assertEqual(autopilot.next_action(), autopilot.direction(head, cycle[head]))
+		self.assertFalse(autopilot.path)
+
+	def test_hamilton_fills_the_field(self):
+		for size in (8, 9):
+			with self.subTest(size=size):
+				env = SnakeEnv(size)
+				env.reset(size)
+				autopilot = Autopilot(env, 'hamilton')
+				done = False
+				while not done and env.apple is not None:
+					state, reward, done = env.step(autopilot.next_action())
+				self.assertFalse(done)
+				self.assertEqual(len(env.body), size * size)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from terminal_games.snake_net import SnakeWorld, WorldView
+
+
+class DeltaTest(unittest.TestCase):
+	# Clients only get a keyframe when they join and a delta every tick,
+	# their views have to stay equal to the world of the server
+
+	def assert_view(self, world, view):
+		bodies = {snake_id: list(snake['body']) for snake_id, snake in world.snakes.items() if snake['body']}
+		self.assertEqual({snake_id: list(body) for snake_id, body in view.snakes.items() if body}, bodies, 'tick {}'.format(world.tick))
+		self.assertEqual(view.cells, {cell: snake_id for snake_id, body in bodies.items() for cell in body})
+		self.assertEqual(view.apple, world.apple)
+		for snake_id, body in bodies.items():
+			self.assertEqual(view.scores[snake_id], world.snakes[snake_id]['score'])
+
+	def play(self, seed, ticks, field_size=12):
+		rng = random.Random(seed)
+		world = SnakeWorld(field_size, seed)
+		views = {}
+
+		def join():
+			snake_id = world.join()
+			views[snake_id] = WorldView()
+			views[snake_id].apply(world.keyframe(snake_id))
+
+		for snake in range(3):
+			join()
+		for tick in range(ticks):
+			# Leaves and joins between two ticks, also several at once
+			for change in range(rng.choice((0, 0, 0, 1, 2))):
+				if views and rng.random() < 0.5:
+					snake_id = rng.choice(sorted(views))
+					world.leave(snake_id)
+					del views[snake_id]
+				elif world.free_cells:
+					join()
+			for snake_id in views:
+				if rng.random() < 0.3:
+					world.steer(snake_id, rng.choice(list(world.steps)))
+
+			delta = world.step()
+			for view in views.values():
+				view.apply(delta)
+				self.assertEqual(view.tick, world.tick)
+				self.assert_view(world, view)
+
+	def test_games(self):
+		for seed in range(8):
+			with self.subTest(seed=seed):
+				self.play(seed, 400)
+
+	def test_join_on_cells_of_a_snake_that_left(self):
+		world = SnakeWorld(6, 1)
+		first = world.join()
+		view = WorldView()
+		view.apply(world.keyframe(first))
+		second = world.join()
+		for tick in range(3):
+			view.apply(world.step())
+
+		# The only free cells are the ones the snake that leaves frees
+		cells = list(world.snakes[second]['body'])
+		for cell in list(world.free_cells):
+			if cell != world.apple:
+				world.occupy(cell)
+		world.leave(second)
+		third = world.join()
+		self.assertIn(world.snakes[third]['body'][0], cells)
+
+		view.apply(world.step())
+		self.assertNotIn(second, view.snakes)
+		self.assertEqual(list(view.snakes[third]), list(world.snakes[third]['body']))
+		self.assertEqual(list(view.snakes[first]), list(world.snakes[first]['body']))
+
+
+if __name__ == '__main__':
+	unittest.main()